@@ -10,8 +10,10 @@ from sqlalchemy.orm import Session
 
 from app.admin_auth import require_admin
 from app.db import get_db
+from app.embedding_cache import get_embedding_cache
+from app.llm_cache import get_llm_cache
 from app.models import Document, Job, JobArtifact
-from app.pinecone_client import PineconeClient, delete_namespace, list_namespaces
+from app.vector_store import get_vector_store
 
 logger = logging.getLogger("admin")
 
@@ -39,6 +41,7 @@ def list_documents(db: Session = Depends(get_db)):
                 "ingest_status": d.ingest_status,
                 "has_summary": d.summary is not None,
                 "pinecone_namespace": d.pinecone_namespace,
+                "vector_count": d.vector_count,
                 "created_at": d.created_at.isoformat() if d.created_at else None,
             }
             for d in docs
@@ -53,6 +56,7 @@ def delete_document_summary(doc_id: UUID, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Document not found")
     doc.summary = None
     doc.summary_chunk_count = 0
+    doc.summary_chunking = None
     db.commit()
     return {"ok": True}
 
@@ -63,11 +67,13 @@ def delete_document_vectors(doc_id: UUID, db: Session = Depends(get_db)):
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     try:
-        pc = PineconeClient()
-        delete_namespace(pc, doc.pinecone_namespace)
+        get_vector_store().delete_namespace(doc.pinecone_namespace)
     except Exception:
-        logger.exception("Failed to delete Pinecone namespace %s", doc.pinecone_namespace)
+        logger.exception("Failed to delete vector namespace %s", doc.pinecone_namespace)
     doc.ingest_status = "pending"
+    doc.vector_count = None
+    doc.vector_count_verified_at = None
+    doc.vector_segment_version = None
     db.commit()
     return {"ok": True}
 
@@ -77,12 +83,11 @@ def delete_document(doc_id: UUID, db: Session = Depends(get_db)):
     doc = db.get(Document, doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
-    # Delete Pinecone namespace
+    # Delete vector namespace
     try:
-        pc = PineconeClient()
-        delete_namespace(pc, doc.pinecone_namespace)
+        get_vector_store().delete_namespace(doc.pinecone_namespace)
     except Exception:
-        logger.exception("Failed to delete Pinecone namespace %s", doc.pinecone_namespace)
+        logger.exception("Failed to delete vector namespace %s", doc.pinecone_namespace)
     # Delete artifacts for all jobs of this document
     job_ids = [j.id for j in doc.jobs]
     if job_ids:
@@ -128,16 +133,16 @@ def delete_job(job_id: UUID, db: Session = Depends(get_db)):
     return {"deleted": 1}
 
 
-# ── Orphan Pinecone namespaces ─────────────────────────────
+# ── Orphan vector namespaces ───────────────────────────────
 
 
 @admin_router.get("/orphan-namespaces")
 def get_orphan_namespaces(db: Session = Depends(get_db)):
     try:
-        pc = PineconeClient()
-        all_ns = list_namespaces(pc)
+        store = get_vector_store()
+        all_ns = store.list_namespaces()
     except Exception:
-        logger.exception("Failed to list Pinecone namespaces")
+        logger.exception("Failed to list vector namespaces")
         return {"namespaces": []}
     # Get all namespaces tracked in the database
     db_namespaces = set(
@@ -154,8 +159,7 @@ def get_orphan_namespaces(db: Session = Depends(get_db)):
 @admin_router.delete("/orphan-namespaces/{namespace:path}")
 def delete_orphan_namespace(namespace: str):
     try:
-        pc = PineconeClient()
-        delete_namespace(pc, namespace)
+        get_vector_store().delete_namespace(namespace)
     except Exception:
         logger.exception("Failed to delete orphan namespace %s", namespace)
         raise HTTPException(status_code=500, detail="Failed to delete namespace")
@@ -165,10 +169,10 @@ def delete_orphan_namespace(namespace: str):
 @admin_router.post("/bulk/delete-orphan-namespaces")
 def bulk_delete_orphan_namespaces(db: Session = Depends(get_db)):
     try:
-        pc = PineconeClient()
-        all_ns = list_namespaces(pc)
+        store = get_vector_store()
+        all_ns = store.list_namespaces()
     except Exception:
-        logger.exception("Failed to list Pinecone namespaces")
+        logger.exception("Failed to list vector namespaces")
         return {"deleted": 0}
     db_namespaces = set(
         db.execute(select(Document.pinecone_namespace)).scalars().all()
@@ -177,13 +181,40 @@ def bulk_delete_orphan_namespaces(db: Session = Depends(get_db)):
     for ns in all_ns:
         if ns and ns not in db_namespaces:
             try:
-                delete_namespace(pc, ns)
+                store.delete_namespace(ns)
                 count += 1
             except Exception:
                 logger.exception("Failed to delete orphan namespace %s", ns)
     return {"deleted": count}
 
 
+# ── Caches ────────────────────────────────────────────────
+
+
+@admin_router.get("/embedding-cache")
+def get_embedding_cache_stats():
+    cache = get_embedding_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@admin_router.get("/llm-cache")
+def get_llm_cache_stats():
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@admin_router.delete("/llm-cache")
+def flush_llm_cache():
+    cache = get_llm_cache()
+    if cache is None:
+        return {"deleted": 0}
+    return {"deleted": cache.clear()}
+
+
 # ── Bulk operations ───────────────────────────────────────
 
 
@@ -211,6 +242,7 @@ def bulk_delete_summaries(db: Session = Depends(get_db)):
     for doc in docs:
         doc.summary = None
         doc.summary_chunk_count = 0
+        doc.summary_chunking = None
         count += 1
     db.commit()
     return {"deleted": count}
@@ -219,19 +251,22 @@ def bulk_delete_summaries(db: Session = Depends(get_db)):
 @admin_router.post("/bulk/delete-vectors")
 def bulk_delete_vectors(db: Session = Depends(get_db)):
     docs = db.execute(select(Document)).scalars().all()
-    pc = None
+    store = None
     try:
-        pc = PineconeClient()
+        store = get_vector_store()
     except Exception:
-        logger.exception("Failed to create PineconeClient")
+        logger.exception("Failed to create vector store")
     count = 0
     for doc in docs:
-        if pc:
+        if store:
             try:
-                delete_namespace(pc, doc.pinecone_namespace)
+                store.delete_namespace(doc.pinecone_namespace)
             except Exception:
                 logger.exception("Failed to delete namespace %s", doc.pinecone_namespace)
         doc.ingest_status = "pending"
+        doc.vector_count = None
+        doc.vector_count_verified_at = None
+        doc.vector_segment_version = None
         count += 1
     db.commit()
     return {"deleted": count}
@@ -239,22 +274,26 @@ def bulk_delete_vectors(db: Session = Depends(get_db)):
 
 @admin_router.post("/bulk/nuke")
 def bulk_nuke(db: Session = Depends(get_db)):
-    # Delete all Pinecone namespaces
+    # Delete all vector namespaces
     docs = db.execute(select(Document)).scalars().all()
-    pc = None
+    store = None
     try:
-        pc = PineconeClient()
+        store = get_vector_store()
     except Exception:
-        logger.exception("Failed to create PineconeClient")
+        logger.exception("Failed to create vector store")
     for doc in docs:
-        if pc:
+        if store:
             try:
-                delete_namespace(pc, doc.pinecone_namespace)
+                store.delete_namespace(doc.pinecone_namespace)
             except Exception:
                 logger.exception("Failed to delete namespace %s", doc.pinecone_namespace)
         doc.summary = None
         doc.summary_chunk_count = 0
+        doc.summary_chunking = None
         doc.ingest_status = "pending"
+        doc.vector_count = None
+        doc.vector_count_verified_at = None
+        doc.vector_segment_version = None
     # Delete all jobs and artifacts
     db.execute(delete(JobArtifact))
     db.execute(delete(Job))
@@ -14,21 +14,71 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./literary.db"
 
+    # Vector store: "pinecone" or "local" (memory-mapped matrices under data_dir)
+    vector_backend: str = "pinecone"
+
     # Pinecone
     pinecone_api_key: str | None = None
     pinecone_index: str = "literary-essays"
     pinecone_cloud: str = "aws"
     pinecone_region: str = "us-east-1"
+    pinecone_pool_size: int = 4
+    pinecone_upsert_max_bytes: int = 1_800_000
+    # describe_index_stats results are shared per process for this long
+    pinecone_stats_ttl_seconds: int = 60
+    # A document's recorded vector count is trusted for this long before being re-checked
+    vector_count_verify_seconds: int = 24 * 60 * 60
 
     # OpenAI
     openai_api_key: str | None = None
     openai_embedding_model: str = "text-embedding-3-small"
     openai_chat_model: str = "gpt-5-mini"
+    # Shared keep-alive connection pool for all OpenAI calls in a worker process
+    openai_max_connections: int = 20
+    openai_keepalive_seconds: float = 120.0
 
     # Gutenberg / Gutendex
     gutenberg_text_url: str = "https://www.gutenberg.org/ebooks/{id}.txt.utf-8"
     gutendex_url: str = "https://gutendex.com/books"
 
+    # Local storage (the /data volume on Fly)
+    data_dir: str = "./data"
+    text_cache_max_bytes: int = 256 * 1024 * 1024
+    embedding_cache_enabled: bool = True
+    # Chat responses keyed by model, temperature and prompt
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 30 * 24 * 60 * 60
+    llm_cache_max_entries: int = 20000
+
+    # Book summarization: "sequential" (each chunk sees the running summary) or
+    # "map_reduce" (chunks summarized concurrently, then combined hierarchically)
+    summary_mode: str = "sequential"
+    # Sequential mode: prior-context budget (synopsis + last few chunk summaries verbatim)
+    summary_context_tokens: int = 4000
+    summary_recent_chunks: int = 3
+    # Cap on the synopsis of older chunks; each synopsis update generates about this much
+    summary_synopsis_tokens: int = 800
+    summary_concurrency: int = 4
+    summary_context_chars: int = 1500
+    summary_reduce_fanin: int = 8
+
+    # Graph nodes run at once, e.g. the per-theme introduction branches
+    graph_concurrency: int = 8
+    # Essay review: "checks" validates citations against the retrieved evidence
+    # and theme coverage locally, calling the LLM reviewer only when those checks
+    # are inconclusive; "llm" always asks the LLM
+    review_mode: str = "checks"
+    # Citations of distinct retrieved segments a theme section needs to pass unreviewed
+    review_min_citations: int = 2
+    # Token budget for the essay draft prompt; book summary and evidence are
+    # trimmed to fit (highest-scoring evidence kept first). 0 disables trimming
+    draft_prompt_tokens: int = 32000
+    # Partial essay text is written to job progress at most this often while streaming
+    stream_progress_seconds: float = 0.5
+    # Graph checkpoints let a resumed job continue after its last completed node:
+    # "sqlite" (file under data_dir), "postgres" (DATABASE_URL) or "none"
+    checkpoint_backend: str = "sqlite"
+
     # Admin
     admin_username: str = "admin"
     admin_password: str = ""
@@ -36,7 +86,23 @@ class Settings(BaseSettings):
     # Worker
     worker_poll_seconds: int = 3
     max_segment_chars: int = 2000
+    # "chars" cuts paragraphs at max_segment_chars; "tokens" packs sentences up
+    # to max_segment_tokens embedding tokens. Changing either re-segments books
+    # and re-embeds their vectors on their next job.
+    segment_splitter: str = "chars"
+    max_segment_tokens: int = 400
+    segment_overlap_tokens: int = 0
+    ingest_batch_size: int = 256
+    # Embedded batches allowed to wait for Pinecone upsert
+    ingest_queue_size: int = 2
+    # Embedding API requests: token/size-bounded batches, run concurrently
+    embedding_batch_tokens: int = 8000
+    embedding_batch_size: int = 64
+    embedding_concurrency: int = 4
     top_k_evidence: int = 8
+    # Summary chunks are filled up to this many chat-model tokens, preferring to
+    # close at a chapter boundary; 0 falls back to summary_chunk_size segments.
+    summary_chunk_tokens: int = 10000
     summary_chunk_size: int = 40
     expand_context_window: int = 3
 
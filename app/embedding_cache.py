@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.config import get_settings
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Embeddings keyed by (model, sha256(text)), stored as float32 blobs in SQLite."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash)"
+            ") WITHOUT ROWID"
+        )
+        # Hit/miss counters live in the file so the API process can report
+        # the worker's hit rate.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)", [("hits",), ("misses",)]
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, model: str, texts: list[str]) -> list[list[float] | None]:
+        hashes = [_text_hash(t) for t in texts]
+        found: dict[str, list[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit.
+            for i in range(0, len(unique), 500):
+                chunk = unique[i : i + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                ).fetchall()
+                for text_hash, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[text_hash] = vec.tolist()
+            results = [found.get(h) for h in hashes]
+            hit_count = sum(1 for r in results if r is not None)
+            self._conn.executemany(
+                "UPDATE counters SET value = value + ? WHERE name = ?",
+                [(hit_count, "hits"), (len(results) - hit_count, "misses")],
+            )
+            self._conn.commit()
+        return results
+
+    def put_many(self, model: str, texts: list[str], vectors: list[list[float]]):
+        rows = [(model, _text_hash(t), array("f", v).tobytes()) for t, v in zip(texts, vectors)]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+
+
+class CachedEmbeddings:
+    """Wraps an embeddings client so only cache misses reach the API."""
+
+    def __init__(self, embeddings, model: str, cache: EmbeddingCache | None):
+        self._embeddings = embeddings
+        self._model = model
+        self._cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self._cache is None:
+            self.misses += len(texts)
+            return self._embeddings.embed_documents(texts)
+
+        results = self._cache.get_many(self._model, texts)
+        missing = [i for i, vec in enumerate(results) if vec is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            miss_texts = [texts[i] for i in missing]
+            vectors = self._embeddings.embed_documents(miss_texts)
+            self._cache.put_many(self._model, miss_texts, vectors)
+            for i, vec in zip(missing, vectors):
+                results[i] = vec
+        return results
+
+
+@lru_cache
+def get_embedding_cache() -> EmbeddingCache | None:
+    settings = get_settings()
+    if not settings.embedding_cache_enabled:
+        return None
+    return EmbeddingCache(Path(settings.data_dir) / "embeddings.sqlite3")
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import openai
+
+from app.logging_config import configure_logging
+
+logger = configure_logging("embedding_executor", "worker.log")
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+class _AdaptiveLimiter:
+    """Concurrency limit that halves on rate limits and creeps back up on success.
+
+    A rate limit also sets a shared pause so every worker backs off together
+    instead of each one hammering the API on its own schedule.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self._max = max_concurrency
+        self._limit = max_concurrency
+        self._active = 0
+        self._pause_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self._pause_until - time.monotonic()
+                if wait <= 0 and self._active < self._limit:
+                    self._active += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, success: bool):
+        with self._cond:
+            self._active -= 1
+            if success and self._limit < self._max:
+                self._limit += 1
+            self._cond.notify_all()
+
+    def backoff(self, delay: float):
+        with self._cond:
+            self._limit = max(1, self._limit // 2)
+            self._pause_until = max(self._pause_until, time.monotonic() + delay)
+            self._cond.notify_all()
+
+
+class EmbeddingExecutor:
+    """Embeds texts in token-bounded batches, concurrently, with backoff on rate limits.
+
+    Exposes ``embed_documents`` so it can stand in for the underlying client
+    (e.g. behind ``CachedEmbeddings``); results come back in input order.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[list[str]], list[list[float]]],
+        count_tokens: Callable[[str], int],
+        max_batch_tokens: int,
+        max_batch_size: int,
+        concurrency: int,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self._embed_batch = embed_batch
+        self._count_tokens = count_tokens
+        self._max_batch_tokens = max_batch_tokens
+        self._max_batch_size = max_batch_size
+        self._concurrency = max(1, concurrency)
+        self._max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._limiter = _AdaptiveLimiter(self._concurrency)
+
+    def make_batches(self, texts: list[str]) -> list[tuple[int, int]]:
+        """Split ``texts`` into (start, end) index ranges within the token and size limits."""
+        batches: list[tuple[int, int]] = []
+        start = 0
+        tokens = 0
+        for i, text in enumerate(texts):
+            n = self._count_tokens(text)
+            if i > start and (tokens + n > self._max_batch_tokens or i - start >= self._max_batch_size):
+                batches.append((start, i))
+                start = i
+                tokens = 0
+            tokens += n
+        if start < len(texts):
+            batches.append((start, len(texts)))
+        return batches
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        batches = self.make_batches(texts)
+        started = time.perf_counter()
+        results: list[list[float]] = [None] * len(texts)  # type: ignore[list-item]
+
+        def run(span: tuple[int, int]):
+            start, end = span
+            results[start:end] = self._embed_with_retry(texts[start:end])
+
+        if len(batches) == 1:
+            run(batches[0])
+        else:
+            with ThreadPoolExecutor(max_workers=min(self._concurrency, len(batches))) as pool:
+                for future in [pool.submit(run, span) for span in batches]:
+                    future.result()
+
+        logger.info(
+            "embedding executor: texts=%s batches=%s concurrency=%s elapsed=%.2fs",
+            len(texts), len(batches), self._concurrency, time.perf_counter() - started,
+        )
+        return results
+
+    def _embed_with_retry(self, texts: list[str]) -> list[list[float]]:
+        attempt = 0
+        while True:
+            self._limiter.acquire()
+            try:
+                vectors = self._embed_batch(texts)
+            except RETRYABLE_ERRORS as exc:
+                self._limiter.release(success=False)
+                attempt += 1
+                if attempt > self._max_retries:
+                    raise
+                delay = self._retry_delay(exc, attempt)
+                logger.info(
+                    "embedding executor: %s on batch of %s, retry %s/%s in %.1fs",
+                    type(exc).__name__, len(texts), attempt, self._max_retries, delay,
+                )
+                self._limiter.backoff(delay)
+                continue
+            except BaseException:
+                self._limiter.release(success=False)
+                raise
+            self._limiter.release(success=True)
+            return vectors
+
+    def _retry_delay(self, exc: Exception, attempt: int) -> float:
+        response = getattr(exc, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(self._max_delay, float(retry_after))
+            except ValueError:
+                pass
+        delay = min(self._max_delay, self._base_delay * 2 ** (attempt - 1))
+        return delay * (0.5 + random.random() / 2)
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 
+from app.graph.checkpoint import get_checkpointer
 from app.graph.nodes import (
     discover_themes_node,
     draft_essay_node,
@@ -12,11 +17,13 @@ from app.graph.nodes import (
     review_essay_node,
     revise_essay_node,
     summarize_book_node,
-    write_theme_intros_node,
+    write_theme_intro_node,
 )
 from app.graph.state import EssayGraphState
 
 
+# expand_context and write_theme_intros (one branch per theme) run in parallel
+# after retrieve_evidence and join at draft_essay.
 PIPELINE_NODES = [
     "ingest",
     "summarize_book",
@@ -31,6 +38,18 @@ PIPELINE_NODES = [
 ]
 
 
+def _fan_out_evidence(state: EssayGraphState) -> list[Send]:
+    sends = [Send("expand_context", state)]
+    for theme in state["themes"]:
+        sends.append(Send("write_theme_intros", {
+            "job_id": state["job_id"],
+            "theme": theme,
+            "evidence": state["evidence"].get(theme, []),
+            "book_summary": state.get("book_summary", ""),
+        }))
+    return sends
+
+
 def _should_revise(state: EssayGraphState) -> str:
     if state.get("essay_approved", False):
         return "persist"
@@ -39,7 +58,7 @@ def _should_revise(state: EssayGraphState) -> str:
     return "revise"
 
 
-def build_essay_graph() -> StateGraph:
+def build_essay_graph(checkpointer: BaseCheckpointSaver | None = None) -> StateGraph:
     graph = StateGraph(EssayGraphState)
 
     graph.add_node("ingest", ingest_node)
@@ -47,7 +66,7 @@ def build_essay_graph() -> StateGraph:
     graph.add_node("discover_themes", discover_themes_node)
     graph.add_node("retrieve_evidence", retrieve_evidence_node)
     graph.add_node("expand_context", expand_context_node)
-    graph.add_node("write_theme_intros", write_theme_intros_node)
+    graph.add_node("write_theme_intros", write_theme_intro_node)
     graph.add_node("draft_essay", draft_essay_node)
     graph.add_node("review_essay", review_essay_node)
     graph.add_node("revise_essay", revise_essay_node)
@@ -57,8 +76,10 @@ def build_essay_graph() -> StateGraph:
     graph.add_edge("ingest", "summarize_book")
     graph.add_edge("summarize_book", "discover_themes")
     graph.add_edge("discover_themes", "retrieve_evidence")
-    graph.add_edge("retrieve_evidence", "expand_context")
-    graph.add_edge("expand_context", "write_theme_intros")
+    graph.add_conditional_edges(
+        "retrieve_evidence", _fan_out_evidence, ["expand_context", "write_theme_intros"]
+    )
+    graph.add_edge("expand_context", "draft_essay")
     graph.add_edge("write_theme_intros", "draft_essay")
     graph.add_edge("draft_essay", "review_essay")
 
@@ -71,4 +92,10 @@ def build_essay_graph() -> StateGraph:
     graph.add_edge("revise_essay", "review_essay")
     graph.add_edge("persist_results", END)
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
+
+
+@lru_cache
+def get_essay_graph():
+    """The compiled essay graph for this process; compiled graphs are safe to reuse across jobs."""
+    return build_essay_graph(checkpointer=get_checkpointer())
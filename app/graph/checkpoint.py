@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import sqlite3
+from functools import lru_cache
+from pathlib import Path
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from app.config import get_settings
+
+
+@lru_cache
+def get_checkpointer() -> BaseCheckpointSaver | None:
+    """Process-wide checkpointer for essay graph runs (thread_id = job id), or None if disabled."""
+    settings = get_settings()
+    backend = settings.checkpoint_backend
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        from langgraph.checkpoint.sqlite import SqliteSaver
+
+        path = Path(settings.data_dir) / "checkpoints.sqlite3"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        saver = SqliteSaver(sqlite3.connect(str(path), check_same_thread=False))
+        saver.setup()
+        return saver
+    if backend == "postgres":
+        try:
+            from langgraph.checkpoint.postgres import PostgresSaver
+        except ImportError as exc:
+            raise RuntimeError(
+                "CHECKPOINT_BACKEND=postgres requires the langgraph-checkpoint-postgres package"
+            ) from exc
+        from psycopg import Connection
+        from psycopg.rows import dict_row
+
+        # Same database as the app; SQLAlchemy's driver suffix isn't a libpq URL.
+        url = settings.database_url.replace("postgresql+psycopg://", "postgresql://", 1)
+        conn = Connection.connect(url, autocommit=True, prepare_threshold=0, row_factory=dict_row)
+        saver = PostgresSaver(conn)
+        saver.setup()
+        return saver
+    raise RuntimeError(f"Unknown CHECKPOINT_BACKEND: {backend}")
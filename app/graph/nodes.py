@@ -3,14 +3,18 @@ from __future__ import annotations
 import json
 import hashlib
 import time
-from typing import Any
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from functools import lru_cache, partial
+from typing import Any, Iterator
 
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_core.runnables import RunnableConfig
 from sqlalchemy import select
 
 from app.config import get_settings
 from app.db import SessionLocal
-from app.gutenberg import fetch_gutenberg_text, normalize_gutenberg_text
+from app.gutenberg import load_gutenberg_text
 from app.graph.prompts import (
     ESSAY_DRAFT_SYSTEM,
     ESSAY_DRAFT_USER,
@@ -18,19 +22,39 @@ from app.graph.prompts import (
     REVIEW_USER,
     REVISE_SYSTEM,
     REVISE_USER,
+    SECTION_REVISE_SYSTEM,
+    SECTION_REVISE_USER,
     SUMMARIZE_CHUNK_SYSTEM,
     SUMMARIZE_CHUNK_USER,
+    SUMMARIZE_MAP_USER,
+    SUMMARIZE_REDUCE_SYSTEM,
+    SUMMARIZE_REDUCE_USER,
+    SYNOPSIS_SYSTEM,
+    SYNOPSIS_UPDATE_USER,
     THEME_DISCOVERY_SYSTEM,
     THEME_DISCOVERY_USER,
     THEME_INTRO_SYSTEM,
     THEME_INTRO_USER,
 )
-from app.graph.state import EssayGraphState
+from app.graph.prompt_budget import SUMMARY_SHARE, select_evidence
+from app.graph.review_checks import check_essay, split_sections, theme_matches, theme_sections
+from app.graph.runtime import runtime_from
+from app.graph.state import EssayGraphState, ThemeIntroState
+from app.ingest_pipeline import embed_and_upsert
 from app.logging_config import configure_logging
-from app.models import Document, Job, JobArtifact
-from app.pinecone_client import PineconeClient, namespace_vector_count, query_similar, upsert_embeddings
+from app.models import Document, Job, JobArtifact, utcnow
 from app.queue import update_job_progress, KeepaliveThread
-from app.segment import segment_text
+from app.segment import Segment, batched
+from app.segment_store import (
+    DocumentSegments,
+    iter_document_segments,
+    load_document_segments,
+    segment_index_version,
+    segmenter_for,
+)
+from app.summary_context import RollingSummaryContext
+from app.tokens import count_tokens, truncate_tokens
+from app.vector_store import get_vector_store
 
 logger = configure_logging("graph", "worker.log")
 
@@ -39,6 +63,33 @@ def _get_settings():
     return get_settings()
 
 
+def _stream_essay(llm, messages: list[dict], job_id: str, step: str, detail: str) -> str:
+    """Stream a completion, publishing the partial markdown to job progress as it grows.
+
+    Progress is written at most every ``stream_progress_seconds``; the API's
+    job stream turns successive ``essay_partial`` values into delta events.
+    """
+    interval = _get_settings().stream_progress_seconds
+    parts: list[str] = []
+    last_write = 0.0
+
+    def publish(db, job):
+        job.progress = {"current_step": step, "detail": detail, "essay_partial": "".join(parts)}
+        db.add(job)
+        db.commit()
+
+    with SessionLocal() as db, KeepaliveThread(interval=30):
+        job = db.get(Job, job_id)
+        for chunk in llm.stream(messages):
+            parts.append(chunk.content)
+            now = time.monotonic()
+            if now - last_write >= interval:
+                last_write = now
+                publish(db, job)
+        publish(db, job)
+    return "".join(parts)
+
+
 def _build_evidence_block(themes: list[str], evidence: dict[str, list[dict]]) -> str:
     lines = []
     for theme in themes:
@@ -48,19 +99,65 @@ def _build_evidence_block(themes: list[str], evidence: dict[str, list[dict]]) ->
     return "\n".join(lines)
 
 
+def _render_passage(passage: dict, cited: list[tuple[int, str]], segments: DocumentSegments) -> str:
+    """One context passage with the cited segments inside it marked inline."""
+    start, end = segments.offsets(passage["first"])[0], segments.offsets(passage["last"])[1]
+    pieces = []
+    cursor = start
+    for idx, seg_id in cited:
+        if passage["first"] <= idx <= passage["last"]:
+            seg_start = segments.offsets(idx)[0]
+            pieces.append(segments.text_between(cursor, seg_start))
+            pieces.append(f"[{seg_id}] ")
+            cursor = seg_start
+    pieces.append(segments.text_between(cursor, end))
+    return f"({passage['passage_id']})\n" + "".join(pieces)
+
+
+def _cited_positions(expanded_evidence: dict[str, list[dict]], segments: DocumentSegments) -> list[tuple[int, str]]:
+    return sorted({
+        (segments.position(item["segment_id"]), item["segment_id"])
+        for items in expanded_evidence.values()
+        for item in items
+        if item.get("passage_id")
+    })
+
+
+def _evidence_line(item: dict, quoted: bool = False) -> str:
+    if item.get("passage_id"):
+        return f"  - [{item['segment_id']}] in passage {item['passage_id']}"
+    if quoted:
+        return f"  - [{item['segment_id']}] (quoted above)"
+    return f"  - [{item['segment_id']}] {item['text']}"
+
+
 def _build_expanded_evidence_block(
-    themes: list[str], expanded_evidence: dict[str, list[dict]]
+    themes: list[str],
+    expanded_evidence: dict[str, list[dict]],
+    passages: list[dict],
+    segments: DocumentSegments,
 ) -> str:
-    lines = []
+    """Quote each context passage once, marking cited segments inline, then list evidence per theme.
+
+    Passages no evidence item points at are left out, and evidence without a
+    passage is quoted in full only the first time it appears.
+    """
+    cited = _cited_positions(expanded_evidence, segments)
+    used = {item.get("passage_id") for items in expanded_evidence.values() for item in items}
+    lines = ["Context passages (cited segments are marked inline with their [segment_id]):", ""]
+    for passage in passages:
+        if passage["passage_id"] in used:
+            lines.append(_render_passage(passage, cited, segments))
+            lines.append("")
+
+    quoted: set[str] = set()
     for theme in themes:
         lines.append(f"Theme: {theme}")
         for item in expanded_evidence.get(theme, []):
-            if item.get("context_before"):
-                lines.append(f"  [context] {item['context_before']}")
-            lines.append(f"  [{item['segment_id']}] {item['text']}")
-            if item.get("context_after"):
-                lines.append(f"  [context] {item['context_after']}")
-            lines.append("")
+            lines.append(_evidence_line(item, item["segment_id"] in quoted))
+            if not item.get("passage_id"):
+                quoted.add(item["segment_id"])
+        lines.append("")
     return "\n".join(lines)
 
 
@@ -75,7 +172,71 @@ def _build_theme_intros_block(themes: list[str], theme_intros: dict[str, str]) -
     return "\n".join(lines)
 
 
-def ingest_node(state: EssayGraphState) -> dict[str, Any]:
+def _iter_document_segments(db, doc: Document, settings) -> Iterator[Segment]:
+    """Stream a document's segments, from the persisted segment index when it matches."""
+    _, normalized = load_gutenberg_text(int(doc.source_ref), expected_hash=doc.canonical_hash)
+    return iter_document_segments(
+        db, doc.id, segment_index_version(settings), normalized, segmenter_for(settings)
+    )
+
+
+@lru_cache(maxsize=2)
+def _document_segments(document_id: str, version: str) -> DocumentSegments:
+    """Per-process, read-only segment accessor shared by every node of a job."""
+    with SessionLocal() as db:
+        doc = db.get(Document, document_id)
+        if not doc:
+            raise RuntimeError(f"Document {document_id} not found")
+        _, normalized = load_gutenberg_text(int(doc.source_ref), expected_hash=doc.canonical_hash)
+        segments = load_document_segments(db, doc.id, version, normalized)
+    if segments is None:
+        raise RuntimeError(f"No segment index for document {document_id} (version {version})")
+    return segments
+
+
+def _vector_batch(document_id: str, segments: list[Segment], embeddings: list[list[float]]) -> list[tuple]:
+    batch = []
+    for seg, embedding in zip(segments, embeddings):
+        metadata = {
+            "document_id": document_id,
+            "paragraph_index": seg.paragraph_index,
+            "text": seg.text,
+        }
+        if seg.chapter is not None:
+            metadata["chapter"] = seg.chapter
+        batch.append((seg.segment_id, embedding, metadata))
+    return batch
+
+
+def _namespace_vector_count(doc: Document, store, settings) -> int:
+    """Vector count for the document's namespace, from the document row while it is fresh."""
+    verified_at = doc.vector_count_verified_at
+    if (
+        doc.vector_count is not None
+        and verified_at is not None
+        and utcnow() - verified_at < timedelta(seconds=settings.vector_count_verify_seconds)
+    ):
+        return doc.vector_count
+    count = store.namespace_count(doc.pinecone_namespace)
+    doc.vector_count = count
+    doc.vector_count_verified_at = utcnow()
+    return count
+
+
+def _vectors_match_segments(doc: Document, settings) -> bool:
+    """Whether the namespace's vectors were embedded from the current segment layout.
+
+    Vectors recorded before the version was stored came from the character
+    splitter, the only one there was; they are taken to match while it is
+    still in use.
+    """
+    version = segment_index_version(settings)
+    if doc.vector_segment_version is None:
+        return settings.segment_splitter == "chars"
+    return doc.vector_segment_version == version
+
+
+def ingest_node(state: EssayGraphState, config: RunnableConfig) -> dict[str, Any]:
     settings = _get_settings()
     job_id = state["job_id"]
     document_id = state["document_id"]
@@ -90,25 +251,15 @@ def ingest_node(state: EssayGraphState) -> dict[str, Any]:
         job = db.get(Job, job_id)
         update_job_progress(db, job, "ingest", "starting ingestion")
 
-        if doc.ingest_status == "ready":
+        vectors_current = _vectors_match_segments(doc, settings)
+        if doc.ingest_status == "ready" and vectors_current:
             logger.info("ingest_node: already ready document_id=%s", document_id)
             update_job_progress(db, job, "ingest", "already ingested")
-            # Re-fetch and segment text so downstream nodes have segments
-            raw = fetch_gutenberg_text(gutenberg_id)
-            normalized = normalize_gutenberg_text(raw)
-            segments = segment_text(normalized, settings.max_segment_chars)
-            seg_dicts = [
-                {
-                    "segment_id": seg.segment_id,
-                    "text": seg.text,
-                    "chapter": seg.chapter,
-                    "paragraph_index": seg.paragraph_index,
-                }
-                for seg in segments
-            ]
+            # Streaming them also rebuilds the segment index if it is missing.
+            segment_count = sum(1 for _ in _iter_document_segments(db, doc, settings))
             return {
-                "segments": seg_dicts,
-                "segment_count": len(seg_dicts),
+                "segment_version": segment_index_version(settings),
+                "segment_count": segment_count,
                 "ingest_complete": True,
                 "current_step": "ingest_complete",
             }
@@ -117,58 +268,107 @@ def ingest_node(state: EssayGraphState) -> dict[str, Any]:
         db.add(doc)
         db.commit()
 
-        logger.info("ingest_node: fetching text gutenberg_id=%s", gutenberg_id)
-        update_job_progress(db, job, "ingest", "fetching text from Gutenberg")
-        raw = fetch_gutenberg_text(gutenberg_id)
-        normalized = normalize_gutenberg_text(raw)
-        segments = segment_text(normalized, settings.max_segment_chars)
-        logger.info("ingest_node: segmented count=%s", len(segments))
-
-        # Check if vectors already exist in Pinecone for this namespace
-        update_job_progress(db, job, "ingest", "checking Pinecone for existing vectors")
-        pc = PineconeClient()
+        # Check if vectors already exist in the vector store for this namespace
+        update_job_progress(db, job, "ingest", "checking vector store for existing vectors")
+        store = get_vector_store()
         existing_count = 0
         try:
-            existing_count = namespace_vector_count(pc, namespace)
+            existing_count = _namespace_vector_count(doc, store, settings)
         except Exception:
-            logger.info("ingest_node: could not check Pinecone stats, will embed")
+            logger.info("ingest_node: could not check vector store stats, will embed")
+
+        if existing_count > 0 and not vectors_current:
+            # Ids and text of the stored vectors follow an old segment layout;
+            # keeping them would map citations onto the wrong passages.
+            logger.info(
+                "ingest_node: segment layout changed (%s -> %s), re-embedding namespace=%s",
+                doc.vector_segment_version, segment_index_version(settings), namespace,
+            )
+            update_job_progress(db, job, "ingest", "segment layout changed, re-embedding")
+            store.delete_namespace(namespace)
+            doc.vector_count = None
+            doc.vector_count_verified_at = None
+            existing_count = 0
+
+        logger.info("ingest_node: fetching text gutenberg_id=%s", gutenberg_id)
+        update_job_progress(db, job, "ingest", "fetching text from Gutenberg")
+
+        # Segments stream through in bounded batches; exhausting the stream
+        # stores the segment index that later nodes read them back from.
+        segment_count = 0
+
+        def segment_batches() -> Iterator[list[Segment]]:
+            nonlocal segment_count
+            for batch in batched(_iter_document_segments(db, doc, settings), settings.ingest_batch_size):
+                segment_count += len(batch)
+                yield batch
 
         if existing_count > 0:
+            for _ in segment_batches():
+                pass
+            if existing_count < segment_count:
+                # An ingest that failed part way through leaves only the
+                # batches upserted before the failure; embed the book again.
+                logger.info(
+                    "ingest_node: namespace=%s has %s of %s vectors, re-embedding",
+                    namespace, existing_count, segment_count,
+                )
+                update_job_progress(
+                    db, job, "ingest",
+                    f"found {existing_count} of {segment_count} vectors, re-embedding",
+                )
+                store.delete_namespace(namespace)
+                doc.vector_count = None
+                doc.vector_count_verified_at = None
+                existing_count = 0
+                segment_count = 0
+            else:
+                doc.vector_segment_version = segment_index_version(settings)
+                logger.info(
+                    "ingest_node: found %s existing vectors in namespace=%s, skipping embedding",
+                    existing_count, namespace,
+                )
+                update_job_progress(
+                    db, job, "ingest",
+                    f"found {existing_count} existing vectors, skipping embedding",
+                )
+
+        if existing_count == 0:
+            embeddings_model = runtime_from(config).embeddings()
+            index_ready = False
+            # Read before the upsert thread starts: ORM attributes expire on
+            # every commit and must not be refreshed from another thread.
+            doc_id = str(doc.id)
+
+            def upsert(batch: list[Segment], embeddings: list[list[float]]):
+                nonlocal index_ready
+                if not index_ready:
+                    store.ensure_ready(dimension=len(embeddings[0]))
+                    index_ready = True
+                store.upsert(namespace, _vector_batch(doc_id, batch, embeddings))
+
+            upserted = embed_and_upsert(
+                segment_batches(),
+                embeddings_model.embed_documents,
+                upsert,
+                queue_size=settings.ingest_queue_size,
+                on_embedded=lambda count: update_job_progress(
+                    db, job, "ingest", f"embedded {count} segments"
+                ),
+            )
             logger.info(
-                "ingest_node: found %s existing vectors in namespace=%s, skipping embedding",
-                existing_count, namespace,
+                "ingest_node: upserted namespace=%s count=%s embedding_cache_hits=%s misses=%s",
+                namespace, upserted, embeddings_model.hits, embeddings_model.misses,
             )
             update_job_progress(
                 db, job, "ingest",
-                f"found {existing_count} existing vectors in Pinecone, skipping embedding",
+                f"embedded {upserted} segments "
+                f"({embeddings_model.hits} from cache, {embeddings_model.misses} via API)",
             )
-        elif segments:
-            update_job_progress(db, job, "ingest", f"embedding {len(segments)} segments")
-
-            embeddings_model = OpenAIEmbeddings(
-                model=settings.openai_embedding_model,
-                api_key=settings.openai_api_key,
-            )
-            texts = [seg.text for seg in segments]
-            embeddings = embeddings_model.embed_documents(texts)
-            logger.info("ingest_node: embedded %s segments", len(embeddings))
-
-            pc.ensure_index(dimension=len(embeddings[0]))
-
-            batch = []
-            for seg, embedding in zip(segments, embeddings):
-                metadata = {
-                    "document_id": str(doc.id),
-                    "paragraph_index": seg.paragraph_index,
-                    "text": seg.text,
-                }
-                if seg.chapter is not None:
-                    metadata["chapter"] = seg.chapter
-                batch.append((seg.segment_id, embedding, metadata))
-
-            update_job_progress(db, job, "ingest", f"upserting {len(batch)} vectors to Pinecone")
-            upsert_embeddings(pc, namespace, batch)
-            logger.info("ingest_node: upserted namespace=%s count=%s", namespace, len(batch))
+            doc.vector_count = upserted
+            doc.vector_count_verified_at = utcnow()
+            doc.vector_segment_version = segment_index_version(settings)
+        logger.info("ingest_node: segmented count=%s", segment_count)
 
         doc.ingest_status = "ready"
         db.add(doc)
@@ -177,41 +377,259 @@ def ingest_node(state: EssayGraphState) -> dict[str, Any]:
         update_job_progress(db, job, "ingest", "ingestion complete")
         logger.info("ingest_node: complete document_id=%s", document_id)
 
-    seg_dicts = [
-        {
-            "segment_id": seg.segment_id,
-            "text": seg.text,
-            "chapter": seg.chapter,
-            "paragraph_index": seg.paragraph_index,
-        }
-        for seg in segments
-    ] if segments else []
-
     return {
-        "segments": seg_dicts,
-        "segment_count": len(seg_dicts),
+        "segment_version": segment_index_version(settings),
+        "segment_count": segment_count,
         "ingest_complete": True,
         "current_step": "ingest_complete",
     }
 
 
-def summarize_book_node(state: EssayGraphState) -> dict[str, Any]:
+def _summary_chunks(segments: DocumentSegments, settings) -> list[list[str]]:
+    """Group segment texts into summarization chunks of at most ``summary_chunk_tokens``.
+
+    A chunk that is at least half full is closed early when a new chapter
+    starts, so chunks tend to line up with chapters. A segment larger than
+    the budget gets a chunk of its own.
+    """
+    budget = settings.summary_chunk_tokens
+    if budget <= 0:
+        texts = [seg.text for seg in segments]
+        chunk_size = settings.summary_chunk_size
+        return [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    tokens = 0
+    chapter = None
+    for seg in segments:
+        n = count_tokens(seg.text, model=settings.openai_chat_model)
+        new_chapter = seg.chapter is not None and seg.chapter != chapter
+        if current and (tokens + n > budget or (new_chapter and tokens >= budget // 2)):
+            chunks.append(current)
+            current, tokens = [], 0
+        current.append(seg.text)
+        tokens += n
+        chapter = seg.chapter
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _summary_chunking(settings, segment_version: str) -> str:
+    """Version key for the chunk layout ``_summary_chunks`` produces; a stored count is only valid under it."""
+    if settings.summary_chunk_tokens <= 0:
+        return f"segments={settings.summary_chunk_size}|{segment_version}"
+    return f"tokens={settings.summary_chunk_tokens}:model={settings.openai_chat_model}|{segment_version}"
+
+
+def _add_usage(usage: dict[str, int], response) -> None:
+    meta = getattr(response, "usage_metadata", None) or {}
+    usage["calls"] += 1
+    usage["input_tokens"] += meta.get("input_tokens", 0)
+    usage["output_tokens"] += meta.get("output_tokens", 0)
+
+
+def _save_summary_progress(job_id: str, document_id: str, summary: str, chunk_count: int, detail: str):
+    """Persist the summary of the first ``chunk_count`` chunks so a failed run resumes after them."""
+    with SessionLocal() as db:
+        doc = db.get(Document, document_id)
+        if doc:
+            doc.summary = summary
+            doc.summary_chunk_count = chunk_count
+            db.add(doc)
+        job = db.get(Job, job_id)
+        job.progress = {
+            "current_step": "summarize_book",
+            "detail": detail,
+            "running_summary": summary,
+        }
+        db.add(job)
+        db.commit()
+
+
+def _summarize_sequential(
+    llm, chunks: list[list[str]], start_chunk_idx: int, running_summary: str,
+    job_id: str, document_id: str, settings, usage: dict[str, int],
+) -> str:
+    """Summarize chunks in order, each prompt carrying a token-bounded view of what came before.
+
+    ``running_summary`` (all chunk summaries appended) is still what gets
+    stored and returned; prompts only see the rolling context.
+    """
+    total_chunks = len(chunks)
+
+    def compress(synopsis: str, summaries: list[str], max_tokens: int) -> str:
+        prompt = SYNOPSIS_UPDATE_USER.format(
+            synopsis=synopsis or "(none yet)",
+            summaries="\n\n".join(summaries),
+            max_words=max(50, max_tokens * 3 // 4),
+        )
+        response = llm.invoke([
+            {"role": "system", "content": SYNOPSIS_SYSTEM},
+            {"role": "user", "content": prompt},
+        ])
+        _add_usage(usage, response)
+        return response.content
+
+    context = RollingSummaryContext(
+        compress,
+        partial(count_tokens, model=settings.openai_chat_model),
+        budget_tokens=settings.summary_context_tokens,
+        recent_chunks=settings.summary_recent_chunks,
+        synopsis_tokens=settings.summary_synopsis_tokens,
+    )
+    with KeepaliveThread(interval=30):
+        context.seed(running_summary)
+
+    for i, chunk in enumerate(chunks[start_chunk_idx:], start=start_chunk_idx):
+        chunk_text = "\n\n".join(chunk)
+        with SessionLocal() as db:
+            job = db.get(Job, job_id)
+            job.progress = {
+                "current_step": "summarize_book",
+                "detail": f"Summarizing chunk {i + 1}/{total_chunks}...",
+                "running_summary": running_summary or "",
+            }
+            db.add(job)
+            db.commit()
+
+        context_tokens = context.tokens
+        prompt = SUMMARIZE_CHUNK_USER.format(
+            running_summary=context.render() or "(none — this is the first chunk)",
+            chunk_text=chunk_text,
+        )
+        with KeepaliveThread(interval=30):
+            response = llm.invoke([
+                {"role": "system", "content": SUMMARIZE_CHUNK_SYSTEM},
+                {"role": "user", "content": prompt},
+            ])
+            _add_usage(usage, response)
+            chunk_summary = response.content
+            context.add(chunk_summary)
+        logger.info(
+            "summarize_book_node: chunk %s/%s done context_tokens=%s synopsis_updates=%s",
+            i + 1, total_chunks, context_tokens, context.compressions,
+        )
+
+        # Append this chunk's summary to the running summary
+        if running_summary:
+            running_summary = running_summary + "\n\n" + chunk_summary
+        else:
+            running_summary = chunk_summary
+
+        _save_summary_progress(
+            job_id, document_id, running_summary, i + 1, f"Completed chunk {i + 1}/{total_chunks}"
+        )
+    return running_summary
+
+
+def _summarize_map_reduce(
+    llm, chunks: list[list[str]], start_chunk_idx: int, resumed_summary: str,
+    job_id: str, document_id: str, settings, usage: dict[str, int],
+) -> str:
+    """Summarize chunks concurrently, each seeing only the tail of the previous chunk, then combine.
+
+    Chunk summaries finish out of order; the contiguous finished prefix is
+    appended to the stored summary and ``summary_chunk_count`` advanced, so a
+    resumed run (in either mode) picks up after it. The stored summary only
+    becomes the combined one once every chunk is done.
+    """
+    total_chunks = len(chunks)
+    context_chars = settings.summary_context_chars
+
+    def summarize_chunk(i: int):
+        previous = chunks[i - 1][-1][-context_chars:] if i > 0 and context_chars > 0 else ""
+        prompt = SUMMARIZE_MAP_USER.format(
+            previous_context=previous or "(none — this is the start of the book)",
+            chunk_text="\n\n".join(chunks[i]),
+        )
+        return llm.invoke([
+            {"role": "system", "content": SUMMARIZE_CHUNK_SYSTEM},
+            {"role": "user", "content": prompt},
+        ])
+
+    def combine(parts: list[str]):
+        prompt = SUMMARIZE_REDUCE_USER.format(summaries="\n\n---\n\n".join(parts))
+        return llm.invoke([
+            {"role": "system", "content": SUMMARIZE_REDUCE_SYSTEM},
+            {"role": "user", "content": prompt},
+        ])
+
+    summaries: dict[int, str] = {}
+    prefix_summary = resumed_summary
+    prefix = start_chunk_idx
+    workers = max(1, settings.summary_concurrency)
+
+    with KeepaliveThread(interval=30), ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(summarize_chunk, i): i for i in range(start_chunk_idx, total_chunks)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                response = future.result()
+            except BaseException:
+                # Don't spend tokens on chunks past a failure; the prefix is already saved.
+                for pending in futures:
+                    pending.cancel()
+                raise
+            _add_usage(usage, response)
+            summaries[i] = response.content
+            logger.info(
+                "summarize_book_node: chunk %s/%s done (%s/%s complete)",
+                i + 1, total_chunks, start_chunk_idx + len(summaries), total_chunks,
+            )
+            advanced = False
+            while prefix < total_chunks - 1 and prefix in summaries:
+                prefix_summary = f"{prefix_summary}\n\n{summaries[prefix]}" if prefix_summary else summaries[prefix]
+                prefix += 1
+                advanced = True
+            if advanced:
+                _save_summary_progress(
+                    job_id, document_id, prefix_summary, prefix,
+                    f"Summarized {start_chunk_idx + len(summaries)}/{total_chunks} chunks",
+                )
+
+        parts = ([resumed_summary] if resumed_summary else []) + [
+            summaries[i] for i in range(start_chunk_idx, total_chunks)
+        ]
+        fanin = max(2, settings.summary_reduce_fanin)
+        level = 0
+        while len(parts) > 1:
+            level += 1
+            groups = [parts[i : i + fanin] for i in range(0, len(parts), fanin)]
+            with SessionLocal() as db:
+                job = db.get(Job, job_id)
+                update_job_progress(
+                    db, job, "summarize_book", f"Combining {len(parts)} summaries (level {level})..."
+                )
+            responses = list(pool.map(combine, [g for g in groups if len(g) > 1]))
+            for response in responses:
+                _add_usage(usage, response)
+            combined = iter(response.content for response in responses)
+            parts = [next(combined) if len(g) > 1 else g[0] for g in groups]
+            logger.info("summarize_book_node: reduce level %s -> %s parts", level, len(parts))
+
+    book_summary = parts[0] if parts else ""
+    _save_summary_progress(job_id, document_id, book_summary, total_chunks, "summarization complete")
+    return book_summary
+
+
+def summarize_book_node(state: EssayGraphState, config: RunnableConfig) -> dict[str, Any]:
     settings = _get_settings()
     job_id = state["job_id"]
     document_id = state["document_id"]
-    segments = state["segments"]
+    segments = _document_segments(document_id, state["segment_version"])
 
-    texts = [seg["text"] for seg in segments]
-    chunk_size = settings.summary_chunk_size
-    chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    chunks = _summary_chunks(segments, settings)
     total_chunks = len(chunks)
-
-    llm = ChatOpenAI(
-        model=settings.openai_chat_model,
-        api_key=settings.openai_api_key,
-        temperature=0.2,
+    logger.info(
+        "summarize_book_node: segments=%s chunks=%s chunk_tokens=%s",
+        len(segments), total_chunks, settings.summary_chunk_tokens,
     )
 
+    llm = runtime_from(config).chat(temperature=0.2)
+    chunking = _summary_chunking(settings, state["segment_version"])
+
     # running_summary accumulates by appending each chunk's summary
     running_summary = ""
     start_chunk_idx = 0
@@ -220,6 +638,26 @@ def summarize_book_node(state: EssayGraphState) -> dict[str, Any]:
     with SessionLocal() as db:
         job = db.get(Job, job_id)
         doc = db.get(Document, document_id)
+        if doc and doc.summary_chunking != chunking:
+            if doc.summary_chunking is None and doc.summary and doc.summary_chunk_count >= -(
+                -len(segments) // settings.summary_chunk_size
+            ):
+                # Finished before chunk layouts were recorded (fixed-size segment
+                # chunks); its count means nothing under the current layout.
+                logger.info("summarize_book_node: keeping complete summary from unversioned chunking")
+                doc.summary_chunk_count = total_chunks
+            elif doc.summary_chunk_count > 0:
+                # Counted in a different chunk layout: resuming would re-summarize
+                # (or skip) parts of the book, so start over.
+                logger.info(
+                    "summarize_book_node: chunking changed (%s -> %s), restarting summary",
+                    doc.summary_chunking, chunking,
+                )
+                doc.summary = None
+                doc.summary_chunk_count = 0
+            doc.summary_chunking = chunking
+            db.add(doc)
+            db.commit()
         if doc:
             if doc.summary:
                 running_summary = doc.summary
@@ -240,51 +678,25 @@ def summarize_book_node(state: EssayGraphState) -> dict[str, Any]:
         logger.info("summarize_book_node: summary already complete.")
         return {"book_summary": running_summary, "current_step": "book_summarized"}
 
-    for i, chunk in enumerate(chunks[start_chunk_idx:], start=start_chunk_idx):
-        chunk_text = "\n\n".join(chunk)
-        with SessionLocal() as db:
-            job = db.get(Job, job_id)
-            job.progress = {
-                "current_step": "summarize_book",
-                "detail": f"Summarizing chunk {i + 1}/{total_chunks}...",
-                "running_summary": running_summary or "",
-            }
-            db.add(job)
-            db.commit()
-
-        prompt = SUMMARIZE_CHUNK_USER.format(
-            running_summary=running_summary or "(none — this is the first chunk)",
-            chunk_text=chunk_text,
+    mode = settings.summary_mode
+    usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+    started = time.perf_counter()
+    if mode == "sequential":
+        running_summary = _summarize_sequential(
+            llm, chunks, start_chunk_idx, running_summary, job_id, document_id, settings, usage
         )
-        with KeepaliveThread(interval=30):
-            response = llm.invoke([
-                {"role": "system", "content": SUMMARIZE_CHUNK_SYSTEM},
-                {"role": "user", "content": prompt},
-            ])
-        chunk_summary = response.content
-        logger.info("summarize_book_node: chunk %s/%s done", i + 1, total_chunks)
-
-        # Append this chunk's summary to the running summary
-        if running_summary:
-            running_summary = running_summary + "\n\n" + chunk_summary
-        else:
-            running_summary = chunk_summary
-
-        # Persist accumulated summary to document and progress
-        with SessionLocal() as db:
-            doc = db.get(Document, document_id)
-            if doc:
-                doc.summary = running_summary
-                doc.summary_chunk_count = i + 1
-                db.add(doc)
-            job = db.get(Job, job_id)
-            job.progress = {
-                "current_step": "summarize_book",
-                "detail": f"Completed chunk {i + 1}/{total_chunks}",
-                "running_summary": running_summary,
-            }
-            db.add(job)
-            db.commit()
+    elif mode == "map_reduce":
+        running_summary = _summarize_map_reduce(
+            llm, chunks, start_chunk_idx, running_summary, job_id, document_id, settings, usage
+        )
+    else:
+        raise RuntimeError(f"Unknown SUMMARY_MODE: {mode}")
+    logger.info(
+        "summarize_book_node: mode=%s chunks=%s resumed_at=%s llm_calls=%s "
+        "input_tokens=%s output_tokens=%s elapsed=%.1fs",
+        mode, total_chunks, start_chunk_idx, usage["calls"],
+        usage["input_tokens"], usage["output_tokens"], time.perf_counter() - started,
+    )
 
     with SessionLocal() as db:
         job = db.get(Job, job_id)
@@ -303,8 +715,7 @@ def summarize_book_node(state: EssayGraphState) -> dict[str, Any]:
     }
 
 
-def discover_themes_node(state: EssayGraphState) -> dict[str, Any]:
-    settings = _get_settings()
+def discover_themes_node(state: EssayGraphState, config: RunnableConfig) -> dict[str, Any]:
     title = state.get("title") or "Unknown Title"
     author = state.get("author") or "Unknown Author"
     book_summary = state.get("book_summary", "")
@@ -314,11 +725,7 @@ def discover_themes_node(state: EssayGraphState) -> dict[str, Any]:
         job = db.get(Job, job_id)
         update_job_progress(db, job, "discover_themes", "identifying literary themes")
 
-    llm = ChatOpenAI(
-        model=settings.openai_chat_model,
-        api_key=settings.openai_api_key,
-        temperature=0.2,
-    )
+    llm = runtime_from(config).chat(temperature=0.2)
     prompt = THEME_DISCOVERY_USER.format(
         title=title, author=author, book_summary=book_summary
     )
@@ -344,7 +751,7 @@ def discover_themes_node(state: EssayGraphState) -> dict[str, Any]:
     return {"themes": themes, "current_step": "themes_discovered"}
 
 
-def retrieve_evidence_node(state: EssayGraphState) -> dict[str, Any]:
+def retrieve_evidence_node(state: EssayGraphState, config: RunnableConfig) -> dict[str, Any]:
     settings = _get_settings()
     themes = state["themes"]
     namespace = state["pinecone_namespace"]
@@ -354,23 +761,18 @@ def retrieve_evidence_node(state: EssayGraphState) -> dict[str, Any]:
         job = db.get(Job, job_id)
         update_job_progress(db, job, "retrieve_evidence", "embedding theme queries")
 
-    embeddings_model = OpenAIEmbeddings(
-        model=settings.openai_embedding_model,
-        api_key=settings.openai_api_key,
-    )
-    query_embeddings = embeddings_model.embed_documents(themes)
+    query_embeddings = runtime_from(config).embeddings().embed_documents(themes)
 
-    pc = PineconeClient()
+    results = get_vector_store().query_many(namespace, query_embeddings, top_k=settings.top_k_evidence)
     evidence: dict[str, list[dict]] = {}
 
-    for theme, embedding in zip(themes, query_embeddings):
-        result = query_similar(pc, namespace, embedding, top_k=settings.top_k_evidence)
+    for theme, hits in zip(themes, results):
         matches = []
-        for match in result.get("matches", []):
-            md = match.get("metadata") or {}
+        for match in hits:
+            md = match["metadata"]
             matches.append({
-                "segment_id": match.get("id"),
-                "score": match.get("score"),
+                "segment_id": match["id"],
+                "score": match["score"],
                 "text": md.get("text"),
                 "chapter": md.get("chapter"),
                 "paragraph_index": md.get("paragraph_index"),
@@ -390,7 +792,7 @@ def retrieve_evidence_node(state: EssayGraphState) -> dict[str, Any]:
 def expand_context_node(state: EssayGraphState) -> dict[str, Any]:
     settings = _get_settings()
     evidence = state["evidence"]
-    segments = state["segments"]
+    segments = _document_segments(state["document_id"], state["segment_version"])
     job_id = state["job_id"]
     window = settings.expand_context_window
 
@@ -398,94 +800,169 @@ def expand_context_node(state: EssayGraphState) -> dict[str, Any]:
         job = db.get(Job, job_id)
         update_job_progress(db, job, "expand_context", "expanding evidence context")
 
-    # Build index lookup: segment_id -> index in segments list
-    seg_index = {seg["segment_id"]: i for i, seg in enumerate(segments)}
+    # One window of segment positions per match, merged where windows overlap
+    # or touch so shared context is quoted once for every theme that cites it.
+    positions = {
+        match["segment_id"]: segments.position(match["segment_id"])
+        for matches in evidence.values()
+        for match in matches
+    }
+    windows = sorted(
+        (max(0, idx - window), min(len(segments) - 1, idx + window))
+        for idx in positions.values()
+        if idx is not None
+    )
+    merged: list[list[int]] = []
+    for first, last in windows:
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    passages = [
+        {"passage_id": f"C{n}", "first": first, "last": last}
+        for n, (first, last) in enumerate(merged, start=1)
+    ]
+    starts = [p["first"] for p in passages]
 
     expanded_evidence: dict[str, list[dict]] = {}
     for theme, matches in evidence.items():
         expanded = []
         for match in matches:
-            sid = match["segment_id"]
-            idx = seg_index.get(sid)
-            context_before = ""
-            context_after = ""
-            if idx is not None:
-                before_segs = segments[max(0, idx - window) : idx]
-                after_segs = segments[idx + 1 : idx + 1 + window]
-                context_before = " ".join(s["text"] for s in before_segs)
-                context_after = " ".join(s["text"] for s in after_segs)
-            expanded.append({
-                **match,
-                "context_before": context_before,
-                "context_after": context_after,
-            })
+            idx = positions[match["segment_id"]]
+            passage_id = passages[bisect_right(starts, idx) - 1]["passage_id"] if idx is not None else None
+            expanded.append({**match, "passage_id": passage_id})
         expanded_evidence[theme] = expanded
 
-    logger.info("expand_context_node: expanded context for %s themes", len(expanded_evidence))
+    logger.info(
+        "expand_context_node: %s matches (%s distinct segments) -> %s context passages",
+        sum(len(m) for m in evidence.values()), len(positions), len(passages),
+    )
 
     with SessionLocal() as db:
         job = db.get(Job, job_id)
         update_job_progress(db, job, "expand_context", "context expansion complete")
 
-    return {"expanded_evidence": expanded_evidence, "current_step": "context_expanded"}
+    return {
+        "expanded_evidence": expanded_evidence,
+        "context_passages": passages,
+        "current_step": "context_expanded",
+    }
 
 
-def write_theme_intros_node(state: EssayGraphState) -> dict[str, Any]:
-    settings = _get_settings()
-    themes = state["themes"]
-    evidence = state["evidence"]
-    book_summary = state.get("book_summary", "")
+def write_theme_intro_node(state: ThemeIntroState, config: RunnableConfig) -> dict[str, Any]:
+    """Write the introduction for one theme; runs as one of several parallel branches."""
+    theme = state["theme"]
     job_id = state["job_id"]
 
     with SessionLocal() as db:
         job = db.get(Job, job_id)
-        update_job_progress(db, job, "write_theme_intros", "writing theme introductions")
+        update_job_progress(db, job, "write_theme_intros", f"writing introduction: {theme}")
 
-    llm = ChatOpenAI(
-        model=settings.openai_chat_model,
-        api_key=settings.openai_api_key,
-        temperature=0.3,
-    )
-
-    theme_intros: dict[str, str] = {}
-    for i, theme in enumerate(themes):
-        with SessionLocal() as db:
-            job = db.get(Job, job_id)
-            update_job_progress(
-                db, job, "write_theme_intros",
-                f"writing introduction {i + 1}/{len(themes)}: {theme}"
-            )
-
-        snippets = evidence.get(theme, [])
-        evidence_text = "\n".join(
-            f"- [{s['segment_id']}] {s['text']}" for s in snippets[:5]
-        )
+    llm = runtime_from(config).chat(temperature=0.3)
 
-        prompt = THEME_INTRO_USER.format(
-            book_summary=book_summary,
-            theme=theme,
-            evidence_snippets=evidence_text,
-        )
-        with KeepaliveThread(interval=30):
-            response = llm.invoke([
-                {"role": "system", "content": THEME_INTRO_SYSTEM},
-                {"role": "user", "content": prompt},
-            ])
-        theme_intros[theme] = response.content
-        logger.info("write_theme_intros_node: wrote intro for theme '%s'", theme)
+    evidence_text = "\n".join(
+        f"- [{s['segment_id']}] {s['text']}" for s in state["evidence"][:5]
+    )
+    prompt = THEME_INTRO_USER.format(
+        book_summary=state["book_summary"],
+        theme=theme,
+        evidence_snippets=evidence_text,
+    )
+    with KeepaliveThread(interval=30):
+        response = llm.invoke([
+            {"role": "system", "content": THEME_INTRO_SYSTEM},
+            {"role": "user", "content": prompt},
+        ])
+    logger.info("write_theme_intro_node: wrote intro for theme '%s'", theme)
 
     with SessionLocal() as db:
         job = db.get(Job, job_id)
-        update_job_progress(
-            db, job, "write_theme_intros",
-            f"wrote {len(theme_intros)} theme introductions"
-        )
+        update_job_progress(db, job, "write_theme_intros", f"wrote introduction: {theme}")
+
+    # No current_step here: parallel branches may only share keys that have a reducer.
+    return {"theme_intros": {theme: response.content}}
+
+
+def _budget_draft_blocks(
+    state: EssayGraphState,
+    themes: list[str],
+    book_summary: str,
+    theme_intros_block: str,
+    expanded_evidence: dict[str, list[dict]],
+    evidence: dict[str, list[dict]],
+    title: str,
+    author: str,
+) -> tuple[str, str, str]:
+    """Fit the draft prompt's blocks into ``draft_prompt_tokens``; returns (summary, intros, evidence).
+
+    Theme intros are kept whole. When the prompt is over budget the book
+    summary is cut to what evidence leaves free (keeping at least its
+    ``SUMMARY_SHARE`` of the budget), then evidence is kept in priority order
+    (see ``prompt_budget.select_evidence``) until the rest is used.
+    """
+    settings = _get_settings()
+    measure = partial(count_tokens, model=settings.openai_chat_model)
+    segments = _document_segments(state["document_id"], state["segment_version"]) if expanded_evidence else None
+    passages = state.get("context_passages", [])
 
-    return {"theme_intros": theme_intros, "current_step": "theme_intros_written"}
+    # Use expanded evidence if available, fall back to basic evidence
+    def render(selected: dict[str, list[dict]]) -> str:
+        if expanded_evidence:
+            return _build_expanded_evidence_block(themes, selected, passages, segments)
+        return _build_evidence_block(themes, selected)
+
+    full_evidence = expanded_evidence or evidence
+    evidence_block = render(full_evidence)
+    overhead = measure(ESSAY_DRAFT_SYSTEM) + measure(ESSAY_DRAFT_USER.format(
+        title=title, author=author, book_summary="", theme_intros_block="", evidence_block="",
+    ))
+    intro_tokens = measure(theme_intros_block)
+    summary_tokens = measure(book_summary)
+    evidence_tokens = measure(evidence_block)
+    budget = settings.draft_prompt_tokens
+    kept = full_evidence
+
+    if budget and overhead + intro_tokens + summary_tokens + evidence_tokens > budget:
+        available = max(0, budget - overhead - intro_tokens)
+        summary_cap = max(int(available * SUMMARY_SHARE), available - evidence_tokens)
+        if summary_tokens > summary_cap:
+            book_summary = truncate_tokens(book_summary, summary_cap, model=settings.openai_chat_model)
+            summary_tokens = measure(book_summary)
+
+        if expanded_evidence:
+            cited = _cited_positions(expanded_evidence, segments)
+            passage_tokens = {p["passage_id"]: measure(_render_passage(p, cited, segments)) for p in passages}
+        else:
+            passage_tokens = {}
+
+        def item_tokens(item: dict, with_text: bool) -> int:
+            if with_text or not expanded_evidence:
+                return measure(_evidence_line({**item, "passage_id": None}))
+            return measure(_evidence_line(item, quoted=True))
+
+        kept = select_evidence(
+            themes,
+            {t: [{"passage_id": None, **i} for i in items] for t, items in full_evidence.items()},
+            passage_tokens,
+            item_tokens,
+            available - summary_tokens - measure(render({})),
+        )
+        evidence_block = render(kept)
+        evidence_tokens = measure(evidence_block)
+
+    kept_passages = {i.get("passage_id") for items in kept.values() for i in items} - {None}
+    logger.info(
+        "draft_essay_node: prompt tokens=%s budget=%s overhead=%s summary=%s intros=%s evidence=%s "
+        "evidence_items=%s/%s passages=%s/%s",
+        overhead + intro_tokens + summary_tokens + evidence_tokens, budget or "none", overhead,
+        summary_tokens, intro_tokens, evidence_tokens,
+        sum(len(v) for v in kept.values()), sum(len(v) for v in full_evidence.values()),
+        len(kept_passages), len(passages) if expanded_evidence else 0,
+    )
+    return book_summary, theme_intros_block, evidence_block
 
 
-def draft_essay_node(state: EssayGraphState) -> dict[str, Any]:
-    settings = _get_settings()
+def draft_essay_node(state: EssayGraphState, config: RunnableConfig) -> dict[str, Any]:
     themes = state["themes"]
     expanded_evidence = state.get("expanded_evidence", {})
     evidence = state["evidence"]
@@ -500,19 +977,12 @@ def draft_essay_node(state: EssayGraphState) -> dict[str, Any]:
         author = state.get("author") or (doc.author if doc else "Unknown Author")
         update_job_progress(db, job, "draft_essay", "generating essay draft")
 
-    # Use expanded evidence if available, fall back to basic evidence
-    if expanded_evidence:
-        evidence_block = _build_expanded_evidence_block(themes, expanded_evidence)
-    else:
-        evidence_block = _build_evidence_block(themes, evidence)
-
-    theme_intros_block = _build_theme_intros_block(themes, theme_intros)
-
-    llm = ChatOpenAI(
-        model=settings.openai_chat_model,
-        api_key=settings.openai_api_key,
-        temperature=0.3,
+    book_summary, theme_intros_block, evidence_block = _budget_draft_blocks(
+        state, themes, book_summary, _build_theme_intros_block(themes, theme_intros),
+        expanded_evidence, evidence, title, author,
     )
+
+    llm = runtime_from(config).chat(temperature=0.3)
     prompt = ESSAY_DRAFT_USER.format(
         title=title,
         author=author,
@@ -520,13 +990,14 @@ def draft_essay_node(state: EssayGraphState) -> dict[str, Any]:
         theme_intros_block=theme_intros_block,
         evidence_block=evidence_block,
     )
-    with KeepaliveThread(interval=30):
-        response = llm.invoke([
+    essay = _stream_essay(
+        llm,
+        [
             {"role": "system", "content": ESSAY_DRAFT_SYSTEM},
             {"role": "user", "content": prompt},
-        ])
-
-    essay = response.content
+        ],
+        job_id, "draft_essay", "writing essay draft",
+    )
     logger.info("draft_essay_node: drafted essay for %s themes", len(themes))
 
     with SessionLocal() as db:
@@ -540,8 +1011,22 @@ def draft_essay_node(state: EssayGraphState) -> dict[str, Any]:
     }
 
 
-def review_essay_node(state: EssayGraphState) -> dict[str, Any]:
-    settings = _get_settings()
+def _review_sections(entries, themes: list[str]) -> dict[str, str]:
+    """Map the reviewer's per-section feedback onto the essay's themes."""
+    sections: dict[str, str] = {}
+    for entry in entries or []:
+        if not isinstance(entry, dict) or not entry.get("feedback"):
+            continue
+        name = str(entry.get("theme", ""))
+        theme = next((t for t in themes if t == name), None) or next(
+            (t for t in themes if theme_matches(t, name)), None
+        )
+        if theme:
+            sections[theme] = " ".join(filter(None, [sections.get(theme), str(entry["feedback"])]))
+    return sections
+
+
+def review_essay_node(state: EssayGraphState, config: RunnableConfig) -> dict[str, Any]:
     themes = state["themes"]
     essay = state["essay_markdown"]
     job_id = state["job_id"]
@@ -551,28 +1036,56 @@ def review_essay_node(state: EssayGraphState) -> dict[str, Any]:
         job = db.get(Job, job_id)
         update_job_progress(db, job, "review_essay", f"reviewing essay (revision {revision_count})")
 
-    llm = ChatOpenAI(
-        model=settings.openai_chat_model,
-        api_key=settings.openai_api_key,
-        temperature=0.1,
-    )
-    prompt = REVIEW_USER.format(themes=", ".join(themes), essay=essay)
-    with KeepaliveThread(interval=30):
-        response = llm.invoke([
-            {"role": "system", "content": REVIEW_SYSTEM},
-            {"role": "user", "content": prompt},
-        ])
+    settings = _get_settings()
+    verdict = "llm"
+    if settings.review_mode == "checks":
+        segments = _document_segments(state["document_id"], state["segment_version"])
+        check = check_essay(
+            essay,
+            themes,
+            {item["segment_id"] for items in state["evidence"].values() for item in items},
+            lambda sid: segments.position(sid) is not None,
+            settings.review_min_citations,
+        )
+        verdict = check.verdict
+        logger.info(
+            "review_essay_node: checks verdict=%s citations=%s invalid=%s theme_issues=%s",
+            verdict, check.citation_count, len(check.invalid_citations), len(check.theme_issues),
+        )
 
-    raw = response.content
-    try:
-        review = json.loads(raw)
-        approved = bool(review.get("approved", False))
-        feedback = review.get("feedback", "")
-    except json.JSONDecodeError:
-        approved = "approved" in raw.lower() and "true" in raw.lower()
-        feedback = raw
+    if verdict == "llm":
+        llm = runtime_from(config).chat(temperature=0.1)
+        prompt = REVIEW_USER.format(themes=", ".join(themes), essay=essay)
+        with KeepaliveThread(interval=30):
+            response = llm.invoke([
+                {"role": "system", "content": REVIEW_SYSTEM},
+                {"role": "user", "content": prompt},
+            ])
 
-    logger.info("review_essay_node: approved=%s revision_count=%s", approved, revision_count)
+        raw = response.content
+        try:
+            review = json.loads(raw)
+            approved = bool(review.get("approved", False))
+            feedback = str(review.get("feedback") or "")
+            section_feedback = _review_sections(review.get("sections"), themes)
+        except (json.JSONDecodeError, AttributeError):
+            approved = "approved" in raw.lower() and "true" in raw.lower()
+            feedback = raw
+            section_feedback = {}
+        # Essay-wide feedback needs a full rewrite; otherwise only the flagged sections change
+        sections = section_feedback if not feedback.strip() else {}
+        feedback = "\n".join(
+            [feedback.strip()] + [f"- Theme '{t}': {f}" for t, f in section_feedback.items()]
+        ).strip()
+    else:
+        approved = verdict == "approve"
+        feedback = check.feedback
+        sections = {} if check.issues else {t: " ".join(i) for t, i in check.theme_issues.items()}
+
+    logger.info(
+        "review_essay_node: approved=%s by=%s sections=%s revision_count=%s",
+        approved, "llm" if verdict == "llm" else "checks", len(sections), revision_count,
+    )
 
     with SessionLocal() as db:
         job = db.get(Job, job_id)
@@ -582,12 +1095,101 @@ def review_essay_node(state: EssayGraphState) -> dict[str, Any]:
     return {
         "essay_approved": approved,
         "review_feedback": feedback,
+        "review_sections": {} if approved else sections,
         "current_step": "essay_reviewed",
     }
 
 
-def revise_essay_node(state: EssayGraphState) -> dict[str, Any]:
-    settings = _get_settings()
+def _splice_sections(essay: str, located: dict, texts: dict[str, str], insert_at: int) -> str:
+    """Replace located theme sections with their new text; other new sections go in at ``insert_at``.
+
+    Edits that overlap (a section nested in another one being replaced) are
+    merged into one replacement of their combined span, their texts kept in
+    essay order, so no edit can cut into text another one already moved.
+    """
+    edits = []
+    for order, (theme, text) in enumerate(texts.items()):
+        text = text.strip() + "\n\n"
+        if theme in located:
+            edits.append((located[theme].start, located[theme].end, order, text))
+        else:
+            edits.append((insert_at, insert_at, order, text))
+    merged: list[tuple[int, int, int, str]] = []
+    for start, end, order, text in sorted(edits):
+        if merged and start < merged[-1][1]:
+            prev_start, prev_end, prev_order, prev_text = merged[-1]
+            merged[-1] = (prev_start, max(prev_end, end), prev_order, prev_text + text)
+        else:
+            merged.append((start, end, order, text))
+    for start, end, _, text in reversed(merged):
+        if start and essay[start - 1] != "\n":
+            text = "\n\n" + text
+        essay = essay[:start] + text + essay[end:]
+    return essay.rstrip() + "\n"
+
+
+def _revise_sections(state: EssayGraphState, section_feedback: dict[str, str], config) -> str:
+    """Regenerate only the flagged theme sections, in parallel, and splice them back in.
+
+    Themes without a section of their own get a new one, placed before the
+    conclusion. The essay with the sections finished so far is published to
+    job progress as each one comes back.
+    """
+    essay = state["essay_markdown"]
+    themes = state["themes"]
+    job_id = state["job_id"]
+    theme_intros = state.get("theme_intros", {})
+    located = theme_sections(essay, themes)
+    level = min((sec.level for sec in located.values()), default=2)
+    insert_at = next(
+        (
+            sec.start
+            for sec in split_sections(essay)
+            if 0 < sec.level <= level and "conclusion" in sec.heading.lower()
+        ),
+        len(essay),
+    )
+    outline = "\n".join(f"{'#' * sec.level} {sec.heading}" for sec in split_sections(essay) if sec.heading)
+    llm = runtime_from(config).chat(temperature=0.3)
+
+    def revise(theme: str) -> str:
+        section = located.get(theme)
+        heading = f"{'#' * section.level} {section.heading}" if section else f"{'#' * level} {theme}"
+        prompt = SECTION_REVISE_USER.format(
+            outline=outline,
+            theme=theme,
+            intro=theme_intros.get(theme, "") or "(none)",
+            feedback=section_feedback[theme],
+            section=section.text.strip() if section else "(missing: write this section)",
+            evidence_block=_build_evidence_block([theme], state["evidence"]),
+            heading=heading,
+        )
+        text = llm.invoke([
+            {"role": "system", "content": SECTION_REVISE_SYSTEM},
+            {"role": "user", "content": prompt},
+        ]).content.strip()
+        return text if text.startswith("#") else f"{heading}\n\n{text}"
+
+    flagged = [t for t in themes if t in section_feedback]
+    texts: dict[str, str] = {}
+    workers = max(1, min(_get_settings().graph_concurrency, len(flagged)))
+    with SessionLocal() as db, KeepaliveThread(interval=30), ThreadPoolExecutor(max_workers=workers) as pool:
+        job = db.get(Job, job_id)
+        futures = {pool.submit(revise, theme): theme for theme in flagged}
+        for future in as_completed(futures):
+            texts[futures[future]] = future.result()
+            job.progress = {
+                "current_step": "revise_essay",
+                "detail": f"revised {len(texts)}/{len(flagged)} sections",
+                "essay_partial": _splice_sections(essay, located, texts, insert_at),
+            }
+            db.add(job)
+            db.commit()
+    # Splice in theme order so new sections keep the essay's theme order
+    return _splice_sections(essay, located, {t: texts[t] for t in flagged}, insert_at)
+
+
+def revise_essay_node(state: EssayGraphState, config: RunnableConfig) -> dict[str, Any]:
     themes = state["themes"]
     evidence = state["evidence"]
     essay = state["essay_markdown"]
@@ -599,21 +1201,34 @@ def revise_essay_node(state: EssayGraphState) -> dict[str, Any]:
         job = db.get(Job, job_id)
         update_job_progress(db, job, "revise_essay", f"revising essay (attempt {revision_count + 1})")
 
+    section_feedback = state.get("review_sections") or {}
+    if section_feedback:
+        revised = _revise_sections(state, section_feedback, config)
+        logger.info(
+            "revise_essay_node: revised %s of %s sections revision_count=%s",
+            len(section_feedback), len(themes), revision_count + 1,
+        )
+        with SessionLocal() as db:
+            job = db.get(Job, job_id)
+            update_job_progress(db, job, "revise_essay", "revision complete")
+        return {
+            "essay_markdown": revised,
+            "revision_count": revision_count + 1,
+            "current_step": "essay_revised",
+        }
+
     evidence_block = _build_evidence_block(themes, evidence)
 
-    llm = ChatOpenAI(
-        model=settings.openai_chat_model,
-        api_key=settings.openai_api_key,
-        temperature=0.3,
-    )
+    llm = runtime_from(config).chat(temperature=0.3)
     prompt = REVISE_USER.format(feedback=feedback, essay=essay, evidence_block=evidence_block)
-    with KeepaliveThread(interval=30):
-        response = llm.invoke([
+    revised = _stream_essay(
+        llm,
+        [
             {"role": "system", "content": REVISE_SYSTEM},
             {"role": "user", "content": prompt},
-        ])
-
-    revised = response.content
+        ],
+        job_id, "revise_essay", f"rewriting essay (attempt {revision_count + 1})",
+    )
     logger.info("revise_essay_node: revised essay revision_count=%s", revision_count + 1)
 
     with SessionLocal() as db:
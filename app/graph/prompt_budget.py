@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import Callable
+
+# Share of the draft prompt's free budget the book summary keeps when the
+# whole prompt doesn't fit; evidence gets the rest.
+SUMMARY_SHARE = 0.25
+
+
+def evidence_priority(themes: list[str], evidence: dict[str, list[dict]]) -> list[tuple[str, dict]]:
+    """(theme, item) pairs, best first: every theme's top match, then every theme's second, ...
+
+    Within a rank, higher retrieval scores come first, so trimming from the
+    end drops the weakest evidence without leaving any theme uncited.
+    """
+    ranked = [
+        (rank, -(item.get("score") or 0.0), order, theme, item)
+        for order, theme in enumerate(themes)
+        for rank, item in enumerate(sorted(evidence.get(theme, []), key=lambda i: -(i.get("score") or 0.0)))
+    ]
+    return [(theme, item) for *_, theme, item in sorted(ranked, key=lambda r: r[:3])]
+
+
+def select_evidence(
+    themes: list[str],
+    expanded_evidence: dict[str, list[dict]],
+    passage_tokens: dict[str, int],
+    item_tokens: Callable[[dict, bool], int],
+    budget: int,
+) -> dict[str, list[dict]]:
+    """Keep the highest-priority evidence that fits in ``budget`` tokens.
+
+    First every item that fits is kept as a bare quote (``passage_id`` None),
+    a segment cited under several themes being quoted only once. Then, best
+    first, items get their context passage back while the budget allows; a
+    passage is quoted once for all the items inside it, which drop their own
+    quotes. ``item_tokens(item, with_text)`` prices one evidence line.
+    """
+    kept: dict[str, list[dict]] = {theme: [] for theme in themes}
+    order: list[tuple[str, dict]] = []
+    quoted: set[str] = set()
+    used = 0
+    for theme, item in evidence_priority(themes, expanded_evidence):
+        cost = item_tokens(item, item["segment_id"] not in quoted)
+        if used + cost > budget:
+            continue
+        used += cost
+        quoted.add(item["segment_id"])
+        kept[theme].append({**item, "passage_id": None})
+        order.append((theme, item))
+
+    restored: set[str] = set()
+    for _, item in order:
+        passage_id = item.get("passage_id")
+        if not passage_id or passage_id in restored:
+            continue
+        in_passage = {o["segment_id"] for _, o in order if o.get("passage_id") == passage_id}
+        members = [m for items in kept.values() for m in items if m["segment_id"] in in_passage]
+        # What the members cost as bare quotes (one full quote per segment) vs as passage references
+        first: dict[str, dict] = {}
+        for member in members:
+            first.setdefault(member["segment_id"], member)
+        saved = sum(item_tokens(m, m is first[m["segment_id"]]) for m in members)
+        refs = sum(item_tokens({**m, "passage_id": passage_id}, False) for m in members)
+        cost = passage_tokens[passage_id] + refs - saved
+        if used + cost > budget:
+            continue
+        used += cost
+        restored.add(passage_id)
+        for member in members:
+            member["passage_id"] = passage_id
+
+    # Restore each theme's retrieval order for the prompt
+    for theme in themes:
+        rank = {item["segment_id"]: i for i, item in enumerate(expanded_evidence.get(theme, []))}
+        kept[theme].sort(key=lambda item: rank[item["segment_id"]])
+    return kept
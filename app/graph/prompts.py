@@ -26,6 +26,46 @@ characters, dialogue, and developments. Do not restate anything from the summary
 New passage:
 {chunk_text}"""
 
+SYNOPSIS_SYSTEM = """\
+You maintain a running synopsis of a book as it is read. Keep it chronological \
+and focused on the main plot, characters, and themes."""
+
+SYNOPSIS_UPDATE_USER = """\
+Current synopsis of the book so far:
+
+{synopsis}
+
+Summaries of the sections that follow it, in order:
+
+{summaries}
+
+Rewrite the synopsis so it also covers these sections. Keep it under {max_words} words; \
+compress older material more than recent material."""
+
+SUMMARIZE_MAP_USER = """\
+For context only, here is the end of the preceding passage (do NOT summarize it):
+
+{previous_context}
+
+Now write a summary of ONLY the following passage. Cover the key events, \
+characters, dialogue, and developments.
+
+Passage:
+{chunk_text}"""
+
+SUMMARIZE_REDUCE_SYSTEM = """\
+You are a literary summarizer. Combine summaries of consecutive parts of a book \
+into a single coherent summary, keeping the chronology, key events, characters, \
+themes, and narrative developments."""
+
+SUMMARIZE_REDUCE_USER = """\
+The following summaries cover consecutive parts of the book, in order:
+
+{summaries}
+
+Combine them into one summary of this whole stretch of the book. \
+Keep important details; drop only repetition."""
+
 THEME_INTRO_SYSTEM = """\
 You are a literary essayist writing contextual introductions for thematic analysis."""
 
@@ -78,8 +118,9 @@ Review the following literary essay. The expected themes are: {themes}.
 Essay:
 {essay}
 
-Respond with a JSON object: {{"approved": true/false, "feedback": "..."}}
-If approved is false, provide specific, actionable feedback for revision."""
+Respond with a JSON object:
+{{"approved": true/false, "feedback": "...", "sections": [{{"theme": "...", "feedback": "..."}}]}}
+If approved is false, give specific, actionable feedback for revision. Put problems confined to one theme's section under "sections", naming the theme exactly as listed above; use "feedback" only for problems that need the whole essay reworked (structure, introduction, conclusion, transitions), and leave it empty otherwise."""
 
 REVISE_SYSTEM = """\
 You are a literary essay writer revising your work based on reviewer feedback. \
@@ -96,3 +137,28 @@ Original essay:
 
 Evidence (for reference):
 {evidence_block}"""
+
+SECTION_REVISE_SYSTEM = """\
+You are a literary essay writer revising one theme section of your essay based on \
+reviewer feedback. Cite evidence in brackets like [segment_id], using only the \
+segment ids given. Return only the section in markdown, starting with its heading."""
+
+SECTION_REVISE_USER = """\
+Essay outline (for context; do not rewrite other sections):
+{outline}
+
+Theme: {theme}
+
+Thematic introduction (the section should open with it):
+{intro}
+
+Feedback:
+{feedback}
+
+Current section:
+{section}
+
+Evidence for this theme:
+{evidence_block}
+
+Return the revised section, starting with the heading line: {heading}"""
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+# [p00012] or [p00012, p00013]; anything else in brackets is not a citation
+CITATION_RE = re.compile(r"\[((?:p\d+)(?:\s*[,;]\s*p\d+)*)\]")
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$", re.MULTILINE)
+WORD_RE = re.compile(r"[a-z0-9']+")
+STOPWORDS = frozenset(
+    "a an and as at by for from in into is its of on or the their this to vs versus with".split()
+)
+
+
+@dataclass
+class EssaySection:
+    heading: str
+    # Markdown heading level (1 for "#"); 0 for text before the first heading
+    level: int
+    # Character span of the section, heading line included, within the essay
+    start: int
+    end: int
+    text: str
+
+    @property
+    def citations(self) -> list[str]:
+        return extract_citations(self.text)
+
+
+@dataclass
+class EssayCheck:
+    """Outcome of the mechanical review: citations against evidence, then theme coverage.
+
+    ``verdict`` is "approve" or "revise" when the checks settle the review on
+    their own, and "llm" when only a model can judge (e.g. a theme that is
+    discussed without a section of its own).
+    """
+
+    verdict: str
+    citation_count: int = 0
+    invalid_citations: list[str] = field(default_factory=list)
+    # Problems that belong to one theme's section, keyed by theme
+    theme_issues: dict[str, list[str]] = field(default_factory=dict)
+    issues: list[str] = field(default_factory=list)
+
+    @property
+    def feedback(self) -> str:
+        lines = [f"- {issue}" for issue in self.issues]
+        for theme, issues in self.theme_issues.items():
+            lines.extend(f"- Theme '{theme}': {issue}" for issue in issues)
+        return "\n".join(lines)
+
+
+def extract_citations(text: str) -> list[str]:
+    """Segment ids cited in ``text``, in order of appearance (with repeats)."""
+    return [sid for group in CITATION_RE.findall(text) for sid in re.split(r"\s*[,;]\s*", group)]
+
+
+def split_sections(essay: str) -> list[EssaySection]:
+    """Split markdown at every heading; text before the first heading gets heading ""."""
+    sections = []
+    matches = list(HEADING_RE.finditer(essay))
+    if not matches or matches[0].start() > 0:
+        end = matches[0].start() if matches else len(essay)
+        sections.append(EssaySection("", 0, 0, end, essay[:end]))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(essay)
+        sections.append(EssaySection(
+            match.group(2), len(match.group(1)), match.start(), end, essay[match.start():end]
+        ))
+    return sections
+
+
+def theme_sections(essay: str, themes: list[str]) -> dict[str, EssaySection]:
+    """The section each theme is discussed under, for themes whose heading can be found.
+
+    A theme section runs from its heading to the next heading of the same or a
+    higher level, so any sub-headings inside it stay part of it. Theme sections
+    never overlap: a heading nested in another theme's section, or one whose
+    section would contain another theme's, is not claimed. A heading that is
+    exactly the theme wins over one that merely mentions it.
+    """
+    sections = [s for s in split_sections(essay) if s.heading]
+    spans = [
+        (s.start, next((t.start for t in sections[i + 1:] if t.level <= s.level), len(essay)))
+        for i, s in enumerate(sections)
+    ]
+    found: dict[str, EssaySection] = {}
+    claimed: list[tuple[int, int]] = []
+    for theme in themes:
+        candidates = sorted(
+            (i for i, s in enumerate(sections) if theme_matches(theme, s.heading)),
+            key=lambda i: sections[i].heading.strip().lower() != theme.strip().lower(),
+        )
+        i = next(
+            (
+                i for i in candidates
+                if all(spans[i][1] <= start or end <= spans[i][0] for start, end in claimed)
+            ),
+            None,
+        )
+        if i is None:
+            continue
+        head = sections[i]
+        start, end = spans[i]
+        claimed.append((start, end))
+        found[theme] = EssaySection(head.heading, head.level, start, end, essay[start:end])
+    return found
+
+
+def _content_words(text: str) -> set[str]:
+    return {w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS and len(w) > 2}
+
+
+def theme_matches(theme: str, text: str) -> bool:
+    """True if ``text`` names the theme outright or shares most of its content words."""
+    if theme.lower() in text.lower():
+        return True
+    words = _content_words(theme)
+    return bool(words) and len(words & _content_words(text)) * 2 >= len(words)
+
+
+def check_essay(
+    essay: str,
+    themes: list[str],
+    evidence_ids: set[str],
+    is_segment: Callable[[str], bool],
+    min_citations: int,
+) -> EssayCheck:
+    """Check an essay's citations and theme coverage without a model.
+
+    ``evidence_ids`` are the segments retrieved for the essay; a citation of
+    any other segment (``is_segment`` tells real but unretrieved ids apart from
+    invented ones) is invalid. Each theme needs a section whose heading names
+    it, citing at least ``min_citations`` retrieved segments. Problems inside a
+    theme's section are reported under that theme so it can be revised alone.
+    """
+    citations = extract_citations(essay)
+    invalid = list(dict.fromkeys(sid for sid in citations if sid not in evidence_ids))
+    check = EssayCheck(verdict="approve", citation_count=len(citations), invalid_citations=invalid)
+    conclusive = True
+
+    def invalid_citation_issues(sids: list[str]) -> list[str]:
+        issues = []
+        invented = [sid for sid in sids if not is_segment(sid)]
+        unretrieved = [sid for sid in sids if is_segment(sid)]
+        if invented:
+            issues.append(
+                f"Citations {', '.join(invented)} do not exist in the book; "
+                "cite only the [segment_id]s given in the evidence."
+            )
+        if unretrieved:
+            issues.append(
+                f"Citations {', '.join(unretrieved)} are not among the retrieved evidence; "
+                "replace them with segments from the evidence list."
+            )
+        return issues
+
+    if not citations:
+        check.issues.append("The essay cites no evidence; support each claim with [segment_id] citations.")
+
+    sections = theme_sections(essay, themes)
+    in_sections: set[str] = set()
+    for theme in themes:
+        section = sections.get(theme)
+        if section is None:
+            if theme_matches(theme, essay) or _content_words(theme) & _content_words(essay):
+                # Touched on somewhere, but whether that is adequate coverage is a judgment call.
+                conclusive = False
+            else:
+                check.theme_issues[theme] = ["The essay does not address this theme; add a section for it."]
+            continue
+        cited = section.citations
+        in_sections.update(cited)
+        issues = invalid_citation_issues(list(dict.fromkeys(sid for sid in cited if sid not in evidence_ids)))
+        valid = [sid for sid in cited if sid in evidence_ids]
+        if not valid:
+            issues.append("This section cites no retrieved evidence; ground its claims in [segment_id] citations.")
+        elif len(set(valid)) < min_citations:
+            conclusive = False
+        if issues:
+            check.theme_issues[theme] = issues
+    check.issues.extend(invalid_citation_issues([sid for sid in invalid if sid not in in_sections]))
+
+    if check.issues or check.theme_issues:
+        check.verdict = "revise"
+    elif not conclusive:
+        check.verdict = "llm"
+    return check
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+from functools import lru_cache, partial
+
+import httpx
+import openai
+from langchain_core.runnables import RunnableConfig
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from app.config import Settings, get_settings
+from app.embedding_cache import CachedEmbeddings, get_embedding_cache
+from app.embedding_executor import EmbeddingExecutor
+from app.llm_cache import CachedChat, get_llm_cache
+from app.tokens import count_tokens
+
+
+class GraphRuntime:
+    """Clients shared by every job a worker process runs.
+
+    One keep-alive HTTP connection pool backs all chat and embedding calls, so
+    nodes stop paying for new clients and TLS handshakes. The worker passes
+    the runtime to nodes as ``config["configurable"]["runtime"]``.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._http_client = openai.DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_connections,
+                keepalive_expiry=settings.openai_keepalive_seconds,
+            )
+        )
+        self._chat: dict[float, ChatOpenAI | CachedChat] = {}
+        self._lock = threading.Lock()
+        client = OpenAIEmbeddings(
+            model=settings.openai_embedding_model,
+            api_key=settings.openai_api_key,
+            chunk_size=settings.embedding_batch_size,
+            # Retries and rate-limit backoff are handled by the executor
+            max_retries=0,
+            http_client=self._http_client,
+        )
+        self._embedding_executor = EmbeddingExecutor(
+            client.embed_documents,
+            partial(count_tokens, model=settings.openai_embedding_model),
+            max_batch_tokens=settings.embedding_batch_tokens,
+            max_batch_size=settings.embedding_batch_size,
+            concurrency=settings.embedding_concurrency,
+        )
+
+    def chat(self, temperature: float) -> ChatOpenAI | CachedChat:
+        """Chat client for ``temperature``, behind the LLM response cache when it is enabled."""
+        with self._lock:
+            llm = self._chat.get(temperature)
+            if llm is None:
+                llm = ChatOpenAI(
+                    model=self.settings.openai_chat_model,
+                    api_key=self.settings.openai_api_key,
+                    temperature=temperature,
+                    http_client=self._http_client,
+                    # Report token usage on the final chunk of streamed responses
+                    stream_usage=True,
+                )
+                cache = get_llm_cache()
+                if cache is not None:
+                    llm = CachedChat(llm, self.settings.openai_chat_model, temperature, cache)
+                self._chat[temperature] = llm
+            return llm
+
+    def embeddings(self) -> CachedEmbeddings:
+        """Cache-backed embeddings; each call gets fresh hit/miss counters."""
+        return CachedEmbeddings(
+            self._embedding_executor, self.settings.openai_embedding_model, get_embedding_cache()
+        )
+
+
+@lru_cache
+def get_runtime() -> GraphRuntime:
+    return GraphRuntime(get_settings())
+
+
+def runtime_from(config: RunnableConfig | None) -> GraphRuntime:
+    """The runtime injected into this graph run, or the process default."""
+    runtime = ((config or {}).get("configurable") or {}).get("runtime")
+    return runtime if runtime is not None else get_runtime()
@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from typing import TypedDict
+from typing import Annotated, TypedDict
+
+
+def merge_dicts(left: dict | None, right: dict | None) -> dict:
+    """Reducer for keys written by parallel branches (one entry per theme)."""
+    return {**(left or {}), **(right or {})}
 
 
 class EssayGraphState(TypedDict, total=False):
@@ -12,8 +17,9 @@ class EssayGraphState(TypedDict, total=False):
     author: str | None
     pinecone_namespace: str
 
-    # Ingest outputs
-    segments: list[dict]
+    # Ingest outputs: segments stay out of state; nodes read them through
+    # the document's stored segment index (see nodes._document_segments)
+    segment_version: str
     segment_count: int
     ingest_complete: bool
 
@@ -28,15 +34,20 @@ class EssayGraphState(TypedDict, total=False):
     essay_approved: bool
     revision_count: int
     review_feedback: str
+    # Feedback per theme whose section alone needs rewriting; empty when the
+    # review calls for a whole-essay revision
+    review_sections: dict[str, str]
 
     # Book summary
     book_summary: str
 
-    # Expanded evidence with surrounding context
-    expanded_evidence: dict[str, list[dict]]
+    # Evidence tagged with the context passage around it; passages are merged
+    # segment windows {"passage_id", "first", "last"} shared across themes
+    expanded_evidence: Annotated[dict[str, list[dict]], merge_dicts]
+    context_passages: list[dict]
 
     # Per-theme introductions
-    theme_intros: dict[str, str]
+    theme_intros: Annotated[dict[str, str], merge_dicts]
 
     # Summarization progress
     chunks_summarized: int
@@ -44,3 +55,12 @@ class EssayGraphState(TypedDict, total=False):
     # Progress
     current_step: str
     error: str | None
+
+
+class ThemeIntroState(TypedDict):
+    """Input sent to one per-theme introduction branch."""
+
+    job_id: str
+    theme: str
+    evidence: list[dict]
+    book_summary: str
@@ -7,6 +7,7 @@ import httpx
 
 from app.config import get_settings
 from app.logging_config import configure_logging
+from app.text_cache import get_text_cache
 
 
 START_RE = re.compile(r"\*\*\* START OF (THIS|THE) PROJECT GUTENBERG EBOOK.*\*\*\*", re.IGNORECASE)
@@ -52,6 +53,30 @@ def normalize_gutenberg_text(raw_text: str) -> str:
     return text.strip()
 
 
+def load_gutenberg_text(gutenberg_id: int, expected_hash: str | None = None) -> tuple[str, str]:
+    """Return ``(canonical_hash, normalized_text)`` for a book.
+
+    Served from the local text cache when possible; otherwise the text is
+    fetched, normalized and written to the cache for the next caller.
+    """
+    cache = get_text_cache()
+    digest = expected_hash or cache.lookup(gutenberg_id)
+    if digest:
+        text = cache.read(digest)
+        if text is not None:
+            logger.info("gutenberg text cache hit: id=%s hash=%s", gutenberg_id, digest[:8])
+            return digest, text
+
+    normalized = normalize_gutenberg_text(fetch_gutenberg_text(gutenberg_id))
+    digest = cache.write(gutenberg_id, normalized)
+    if expected_hash and digest != expected_hash:
+        logger.warning(
+            "gutenberg text changed upstream: id=%s expected=%s got=%s",
+            gutenberg_id, expected_hash[:8], digest[:8],
+        )
+    return digest, normalized
+
+
 def fetch_gutenberg_metadata(gutenberg_id: int) -> dict[str, str | None]:
     settings = get_settings()
     with httpx.Client(timeout=20, follow_redirects=True) as client:
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Callable, Iterable
+
+from app.logging_config import configure_logging
+from app.segment import Segment
+
+logger = configure_logging("ingest_pipeline", "worker.log")
+
+_DONE = object()
+
+
+def embed_and_upsert(
+    batches: Iterable[list[Segment]],
+    embed: Callable[[list[str]], list[list[float]]],
+    upsert: Callable[[list[Segment], list[list[float]]], None],
+    queue_size: int,
+    on_embedded: Callable[[int], None] | None = None,
+) -> int:
+    """Embed segment batches and upsert them on a separate thread as they are ready.
+
+    Embedding runs on the calling thread; at most ``queue_size`` embedded
+    batches wait for the upsert thread, so the network time of both sides
+    overlaps while only a bounded number of vectors is held in memory.
+    ``on_embedded`` is called on the calling thread with the running total.
+    Returns the number of segments upserted.
+    """
+    pending: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+    errors: list[BaseException] = []
+    upserted = 0
+
+    def consume():
+        nonlocal upserted
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                return
+            if errors:
+                continue  # drain so the producer never blocks on a dead consumer
+            segments, embeddings = item
+            try:
+                upsert(segments, embeddings)
+                upserted += len(segments)
+            except BaseException as exc:  # noqa: BLE001
+                errors.append(exc)
+
+    consumer = threading.Thread(target=consume, name="ingest-upsert", daemon=True)
+    consumer.start()
+    embedded = 0
+    try:
+        for segments in batches:
+            if errors:
+                break
+            embeddings = embed([seg.text for seg in segments])
+            embedded += len(segments)
+            pending.put((segments, embeddings))
+            if on_embedded:
+                on_embedded(embedded)
+    finally:
+        pending.put(_DONE)
+        consumer.join()
+
+    if errors:
+        raise errors[0]
+    logger.info("ingest pipeline: embedded=%s upserted=%s", embedded, upserted)
+    return upserted
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from app.config import get_settings
+
+
+def _prompt_key(model: str, temperature: float, messages: list[dict]) -> str:
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Chat completions keyed by (model, temperature, prompt hash), stored in SQLite.
+
+    Entries expire after ``ttl_seconds``; beyond ``max_entries`` the least
+    recently used ones are evicted.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: int, max_entries: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " content TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)", [("hits",), ("misses",)]
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM responses WHERE key = ? AND created_at > ?", (key, now - self._ttl)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.execute(
+                "UPDATE counters SET value = value + 1 WHERE name = ?", ("hits" if row else "misses",)
+            )
+            self._conn.commit()
+        return row[0] if row else None
+
+    def put(self, key: str, model: str, content: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, content, now, now),
+            )
+            self._conn.execute("DELETE FROM responses WHERE created_at <= ?", (now - self._ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?"
+                ")",
+                (self._max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self) -> int:
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM responses").rowcount
+            self._conn.execute("UPDATE counters SET value = 0")
+            self._conn.commit()
+        return deleted
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0) FROM responses"
+            ).fetchone()
+            by_model = dict(
+                self._conn.execute("SELECT model, COUNT(*) FROM responses GROUP BY model").fetchall()
+            )
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "content_bytes": size,
+            "by_model": by_model,
+            "ttl_seconds": self._ttl,
+            "max_entries": self._max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+
+
+class CachedChat:
+    """Wraps a chat model so identical prompts are answered from the cache.
+
+    Cached answers come back as an ``AIMessage`` with no usage metadata, since
+    no tokens were spent on them.
+    """
+
+    def __init__(self, llm, model: str, temperature: float, cache: LLMCache):
+        self._llm = llm
+        self._model = model
+        self._temperature = temperature
+        self._cache = cache
+
+    def invoke(self, messages: list[dict]) -> AIMessage:
+        key = _prompt_key(self._model, self._temperature, messages)
+        content = self._cache.get(key)
+        if content is not None:
+            return AIMessage(content=content, response_metadata={"llm_cache": "hit"})
+        response = self._llm.invoke(messages)
+        self._cache.put(key, self._model, response.content)
+        return response
+
+    def stream(self, messages: list[dict]) -> Iterator[AIMessageChunk]:
+        """Stream a completion; a cached answer arrives as a single chunk."""
+        key = _prompt_key(self._model, self._temperature, messages)
+        content = self._cache.get(key)
+        if content is not None:
+            yield AIMessageChunk(content=content, response_metadata={"llm_cache": "hit"})
+            return
+        parts = []
+        for chunk in self._llm.stream(messages):
+            parts.append(chunk.content)
+            yield chunk
+        self._cache.put(key, self._model, "".join(parts))
+
+
+@lru_cache
+def get_llm_cache() -> LLMCache | None:
+    settings = get_settings()
+    if not settings.llm_cache_enabled:
+        return None
+    return LLMCache(
+        Path(settings.data_dir) / "llm_cache.sqlite3",
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        max_entries=settings.llm_cache_max_entries,
+    )
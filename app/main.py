@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
+import time
 from uuid import UUID
 from pathlib import Path
 from time import perf_counter
@@ -18,7 +18,7 @@ from sse_starlette.sse import EventSourceResponse
 
 from app.config import get_settings
 from app.db import get_db, SessionLocal
-from app.gutenberg import fetch_gutenberg_metadata, fetch_gutenberg_text, normalize_gutenberg_text, search_gutenberg
+from app.gutenberg import fetch_gutenberg_metadata, load_gutenberg_text, search_gutenberg
 from app.logging_config import configure_logging, log_startup_config
 from app.models import Document, Job, JobArtifact
 from app.schemas import JobCreateRequest, JobResultResponse, JobStatusResponse, GutenbergSearchResponse
@@ -52,9 +52,7 @@ async def log_requests(request: Request, call_next):
 
 def _ensure_document(db: Session, gutenberg_id: int) -> Document:
     logger.info("ensure_document: gutenberg_id=%s", gutenberg_id)
-    raw = fetch_gutenberg_text(gutenberg_id)
-    normalized = normalize_gutenberg_text(raw)
-    content_hash = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    content_hash, _ = load_gutenberg_text(gutenberg_id)
 
     existing = db.execute(
         select(Document).where(Document.canonical_hash == content_hash)
@@ -249,13 +247,18 @@ def _get_job_progress(job_id: UUID) -> dict | None:
         }
 
 
+def _utf16_length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
 @api.get("/jobs/{job_id}/stream")
 async def job_stream(job_id: UUID):
     async def event_generator():
         last_step = None
         last_detail = None
         last_summary = None
-        heartbeat_counter = 0
+        last_partial = ""
+        last_sent_at = time.monotonic()
         while True:
             job_info = await asyncio.to_thread(_get_job_progress, job_id)
             if not job_info:
@@ -266,6 +269,7 @@ async def job_stream(job_id: UUID):
             current_step = progress.get("current_step")
             detail = progress.get("detail", "")
             running_summary = progress.get("running_summary", "")
+            essay_partial = progress.get("essay_partial", "")
 
             changed = (
                 current_step
@@ -287,14 +291,27 @@ async def job_stream(job_id: UUID):
                 last_step = current_step
                 last_detail = detail
                 last_summary = running_summary
-                heartbeat_counter = 0
-            else:
-                # Send a heartbeat comment every ~30s (15 cycles * 2s)
-                # to keep the connection alive through proxies
-                heartbeat_counter += 1
-                if heartbeat_counter >= 15:
-                    yield {"comment": "heartbeat"}
-                    heartbeat_counter = 0
+                last_sent_at = time.monotonic()
+
+            if essay_partial and essay_partial != last_partial:
+                # Send only the new text; a partial that doesn't extend what was
+                # sent (e.g. a revision started) restarts from offset 0. The
+                # offset counts UTF-16 code units, as JavaScript string lengths do.
+                extends = essay_partial.startswith(last_partial)
+                yield {
+                    "event": "essay_delta",
+                    "data": json.dumps({
+                        "step": current_step,
+                        "offset": _utf16_length(last_partial) if extends else 0,
+                        "delta": essay_partial[len(last_partial):] if extends else essay_partial,
+                    }),
+                }
+                last_partial = essay_partial
+                last_sent_at = time.monotonic()
+            elif time.monotonic() - last_sent_at >= 30:
+                # Heartbeat comment keeps the connection alive through proxies
+                yield {"comment": "heartbeat"}
+                last_sent_at = time.monotonic()
 
             job_status = job_info.get("status")
             if job_status in ("succeeded", "failed"):
@@ -304,7 +321,8 @@ async def job_stream(job_id: UUID):
                 }
                 return
 
-            await asyncio.sleep(2)
+            # Poll faster while an essay is streaming in
+            await asyncio.sleep(0.5 if essay_partial else 2)
 
     return EventSourceResponse(event_generator())
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, String, Text, DateTime, func, Index, UUID
+from sqlalchemy import ForeignKey, String, Text, DateTime, func, Index, UUID, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import JSON
 
@@ -37,11 +37,45 @@ class Document(Base):
     author: Mapped[str | None] = mapped_column(String(255), nullable=True)
     summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     summary_chunk_count: Mapped[int] = mapped_column(default=0)
+    # Chunk layout summary_chunk_count refers to (see nodes._summary_chunking)
+    summary_chunking: Mapped[str | None] = mapped_column(String(255), nullable=True)
     ingest_status: Mapped[str] = mapped_column(String(50), default="pending")
     pinecone_namespace: Mapped[str] = mapped_column(String(255))
+    # Recorded when an upsert finishes so jobs need not ask the vector store
+    vector_count: Mapped[int | None] = mapped_column(nullable=True)
+    vector_count_verified_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Segment index version the namespace's vectors were embedded from
+    vector_segment_version: Mapped[str | None] = mapped_column(String(255), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
 
     jobs: Mapped[list["Job"]] = relationship("Job", back_populates="document")
+    segment_indexes: Mapped[list["DocumentSegmentIndex"]] = relationship(
+        "DocumentSegmentIndex", back_populates="document", cascade="all, delete-orphan"
+    )
+
+
+class DocumentSegmentIndex(Base):
+    """Segment layout of a document's normalized text for one segmenter version.
+
+    ``entries`` is ``{"chapters": [...], "segments": [[segment_id, chapter_idx,
+    paragraph_index, start_offset, end_offset(, token_count)], ...]}``; segment
+    text is sliced back out of the cached normalized text.
+    """
+
+    __tablename__ = "document_segment_indexes"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("documents.id"))
+    version: Mapped[str] = mapped_column(String(64))
+    segment_count: Mapped[int] = mapped_column(default=0)
+    entries: Mapped[dict] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+
+    document: Mapped[Document] = relationship("Document", back_populates="segment_indexes")
+
+    __table_args__ = (
+        UniqueConstraint("document_id", "version", name="uq_document_segment_indexes_document_version"),
+    )
 
 
 class Job(Base):
@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from typing import Iterable
+import json
+import threading
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Iterable, Iterator
 
 from pinecone import Pinecone, ServerlessSpec
 
@@ -8,12 +13,27 @@ from app.config import get_settings
 from app.logging_config import configure_logging
 
 
+@lru_cache(maxsize=None)
+def _get_pinecone(api_key: str, pool_threads: int) -> Pinecone:
+    return Pinecone(api_key=api_key, pool_threads=pool_threads)
+
+
+@lru_cache(maxsize=None)
+def _get_index(api_key: str, pool_threads: int, index_name: str):
+    # Index handles own the HTTP connection pool; build one per process and reuse it.
+    return _get_pinecone(api_key, pool_threads).Index(index_name)
+
+
 class PineconeClient:
     def __init__(self):
         settings = get_settings()
         if not settings.pinecone_api_key:
             raise RuntimeError("PINECONE_API_KEY is required")
-        self._pc = Pinecone(api_key=settings.pinecone_api_key)
+        self._api_key = settings.pinecone_api_key
+        self._pool_size = max(1, settings.pinecone_pool_size)
+        self._upsert_max_bytes = settings.pinecone_upsert_max_bytes
+        self._stats_ttl = settings.pinecone_stats_ttl_seconds
+        self._pc = _get_pinecone(self._api_key, self._pool_size)
         self._index_name = settings.pinecone_index
         self._cloud = settings.pinecone_cloud
         self._region = settings.pinecone_region
@@ -36,10 +56,54 @@ class PineconeClient:
             )
 
     def index(self):
-        return self._pc.Index(self._index_name)
+        return _get_index(self._api_key, self._pool_size, self._index_name)
+
+
+# describe_index_stats covers every namespace in the index and gets slower as
+# books accumulate, so one result per index is shared for a short TTL.
+_stats_lock = threading.Lock()
+_stats_cache: dict[str, tuple[float, dict[str, int]]] = {}
+
+
+def _namespace_counts(pc: PineconeClient) -> dict[str, int]:
+    with _stats_lock:
+        cached = _stats_cache.get(pc._index_name)
+    if cached and time.monotonic() - cached[0] < pc._stats_ttl:
+        return cached[1]
+    stats = pc.index().describe_index_stats()
+    counts = {ns: info.get("vector_count", 0) for ns, info in stats.get("namespaces", {}).items()}
+    with _stats_lock:
+        _stats_cache[pc._index_name] = (time.monotonic(), counts)
+    pc._logger.info("pinecone describe_index_stats namespaces=%s", len(counts))
+    return counts
+
+
+def invalidate_stats_cache(pc: PineconeClient):
+    with _stats_lock:
+        _stats_cache.pop(pc._index_name, None)
+
+
+# Pinecone caps upserts at 1000 vectors and 2 MB per request.
+UPSERT_MAX_VECTORS = 1000
+
 
+def _estimate_upsert_bytes(item: dict) -> int:
+    # JSON-encoded floats run up to ~22 characters each including the separator.
+    return len(item["id"]) + 22 * len(item["values"]) + len(json.dumps(item["metadata"])) + 64
 
-UPSERT_BATCH_SIZE = 100
+
+def _byte_batches(payload: Iterable[dict], max_bytes: int) -> Iterator[list[dict]]:
+    batch: list[dict] = []
+    size = 0
+    for item in payload:
+        item_bytes = _estimate_upsert_bytes(item)
+        if batch and (size + item_bytes > max_bytes or len(batch) >= UPSERT_MAX_VECTORS):
+            yield batch
+            batch, size = [], 0
+        batch.append(item)
+        size += item_bytes
+    if batch:
+        yield batch
 
 
 def upsert_embeddings(
@@ -47,30 +111,40 @@ def upsert_embeddings(
     namespace: str,
     vectors: Iterable[tuple[str, list[float], dict]],
 ):
+    """Upsert vectors in payload-size-bounded batches, up to the client's pool size in parallel."""
     index = pc.index()
-    payload = [{"id": vid, "values": values, "metadata": metadata} for vid, values, metadata in vectors]
-    for i in range(0, len(payload), UPSERT_BATCH_SIZE):
-        batch = payload[i : i + UPSERT_BATCH_SIZE]
-        index.upsert(vectors=batch, namespace=namespace)
-        pc._logger.info("pinecone upsert namespace=%s batch=%s/%s", namespace, i + len(batch), len(payload))
+    payload = ({"id": vid, "values": values, "metadata": metadata} for vid, values, metadata in vectors)
+    sent = 0
+    with ThreadPoolExecutor(max_workers=pc._pool_size, thread_name_prefix="pinecone-upsert") as pool:
+        in_flight: dict = {}
+
+        def collect(return_when):
+            nonlocal sent
+            done, _ = wait(in_flight, return_when=return_when)
+            for future in done:
+                future.result()
+                sent += in_flight.pop(future)
+            pc._logger.info("pinecone upsert namespace=%s sent=%s", namespace, sent)
+
+        for batch in _byte_batches(payload, pc._upsert_max_bytes):
+            # Bound the batches held in memory to what the pool can work on.
+            if len(in_flight) >= 2 * pc._pool_size:
+                collect(FIRST_COMPLETED)
+            in_flight[pool.submit(index.upsert, vectors=batch, namespace=namespace)] = len(batch)
+        if in_flight:
+            collect(ALL_COMPLETED)
+    invalidate_stats_cache(pc)
 
 
 def namespace_vector_count(pc: PineconeClient, namespace: str) -> int:
-    index = pc.index()
-    stats = index.describe_index_stats()
-    ns_map = stats.get("namespaces", {})
-    ns_info = ns_map.get(namespace, {})
-    count = ns_info.get("vector_count", 0)
+    count = _namespace_counts(pc).get(namespace, 0)
     pc._logger.info("pinecone namespace_vector_count namespace=%s count=%s", namespace, count)
     return count
 
 
 def list_namespaces(pc: PineconeClient) -> dict[str, int]:
     """Return {namespace: vector_count} for all namespaces in the index."""
-    index = pc.index()
-    stats = index.describe_index_stats()
-    ns_map = stats.get("namespaces", {})
-    result = {ns: info.get("vector_count", 0) for ns, info in ns_map.items()}
+    result = dict(_namespace_counts(pc))
     pc._logger.info("pinecone list_namespaces count=%s", len(result))
     return result
 
@@ -78,6 +152,7 @@ def list_namespaces(pc: PineconeClient) -> dict[str, int]:
 def delete_namespace(pc: PineconeClient, namespace: str):
     index = pc.index()
     index.delete(delete_all=True, namespace=namespace)
+    invalidate_stats_cache(pc)
     pc._logger.info("pinecone delete_namespace namespace=%s", namespace)
 
 
@@ -96,3 +171,24 @@ def query_similar(
     )
     pc._logger.info("pinecone query namespace=%s top_k=%s matches=%s", namespace, top_k, len(result.get("matches", [])))
     return result
+
+
+def query_similar_batch(
+    pc: PineconeClient,
+    namespace: str,
+    query_vectors: list[list[float]],
+    top_k: int,
+):
+    """Run several queries against one namespace concurrently; results are in input order."""
+    index = pc.index()
+
+    def run(vector: list[float]):
+        return index.query(vector=vector, namespace=namespace, top_k=top_k, include_metadata=True)
+
+    with ThreadPoolExecutor(max_workers=min(pc._pool_size, max(1, len(query_vectors)))) as pool:
+        results = list(pool.map(run, query_vectors))
+    pc._logger.info(
+        "pinecone query_batch namespace=%s queries=%s top_k=%s matches=%s",
+        namespace, len(query_vectors), top_k, sum(len(r.get("matches", [])) for r in results),
+    )
+    return results
@@ -115,7 +115,13 @@ class KeepaliveThread:
 
 
 def update_job_progress(db: Session, job: Job, step: str, detail: str):
-    job.progress = {"current_step": step, "detail": detail}
+    progress = {"current_step": step, "detail": detail}
+    # The streamed essay stays until a newer one replaces it, so the job stream
+    # can still deliver its final text after the writing step has moved on.
+    essay_partial = (job.progress or {}).get("essay_partial")
+    if essay_partial:
+        progress["essay_partial"] = essay_partial
+    job.progress = progress
     db.add(job)
     db.commit()
     # Send keepalive in background thread to avoid blocking
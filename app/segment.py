@@ -1,6 +1,18 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# End of a sentence: terminal punctuation, optional closing quotes/brackets, then whitespace.
+SENTENCE_END_RE = re.compile(r"[.!?]+[\"'\u201d\u2019)\]]*\s+")
+WORD_RE = re.compile(r"\S+\s*")
+
+# (start, end, token_count) of one chunk of a paragraph
+Span = tuple[int, int, "int | None"]
 
 
 @dataclass
@@ -9,42 +21,161 @@ class Segment:
     text: str
     chapter: str | None
     paragraph_index: int
+    # Character offsets of ``text`` within the normalized document text
+    start_offset: int = 0
+    end_offset: int = 0
+    # Embedding-model token count, when the segmenter measured it
+    token_count: int | None = None
 
 
 def segment_text(text: str, max_chars: int) -> list[Segment]:
-    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
-    segments: list[Segment] = []
+    return list(iter_segments(text, max_chars))
+
+
+def iter_segments(text: str, max_chars: int) -> Iterator[Segment]:
+    """Lazily yield segments of ``text``; only one paragraph is materialized at a time."""
+    return _iter_split_paragraphs(
+        text, lambda start, end: _split_long_paragraph(start, end, max_chars)
+    )
+
+
+def iter_token_segments(
+    text: str,
+    max_tokens: int,
+    count_tokens: Callable[[str], int],
+    overlap_tokens: int = 0,
+) -> Iterator[Segment]:
+    """Lazily yield segments of at most ``max_tokens`` tokens, split on sentence boundaries.
+
+    Long paragraphs are packed sentence by sentence (word by word for a single
+    over-long sentence). With ``overlap_tokens`` each continuation chunk
+    repeats the trailing sentences of the previous one, up to that many tokens.
+    """
+    return _iter_split_paragraphs(
+        text,
+        lambda start, end: _split_by_tokens(text, start, end, max_tokens, overlap_tokens, count_tokens),
+    )
+
+
+def _iter_split_paragraphs(
+    text: str, split: Callable[[int, int], Iterable[tuple[int, int] | Span]]
+) -> Iterator[Segment]:
     chapter = None
     paragraph_index = 0
 
-    for para in paragraphs:
+    for para_start, para_end in _paragraph_spans(text):
+        para = text[para_start:para_end]
         if len(para) < 80 and para.upper().startswith("CHAPTER"):
             chapter = para
             continue
 
-        for chunk in _split_long_paragraph(para, max_chars):
-            segment_id = f"p{paragraph_index:05d}"
-            segments.append(
-                Segment(
-                    segment_id=segment_id,
-                    text=chunk,
-                    chapter=chapter,
-                    paragraph_index=paragraph_index,
-                )
+        for chunk_start, chunk_end, *measured in split(para_start, para_end):
+            yield Segment(
+                segment_id=f"p{paragraph_index:05d}",
+                text=text[chunk_start:chunk_end],
+                chapter=chapter,
+                paragraph_index=paragraph_index,
+                start_offset=chunk_start,
+                end_offset=chunk_end,
+                token_count=measured[0] if measured else None,
             )
             paragraph_index += 1
 
-    return segments
 
+def batched(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Yield lists of up to ``size`` items from ``items`` without materializing the rest."""
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _paragraph_spans(text: str) -> Iterator[tuple[int, int]]:
+    """Yield (start, end) offsets of the stripped, non-empty blank-line separated paragraphs."""
+    pos = 0
+    length = len(text)
+    while pos <= length:
+        stop = text.find("\n\n", pos)
+        if stop == -1:
+            stop = length
+        raw = text[pos:stop]
+        stripped = raw.strip()
+        if stripped:
+            start = pos + (len(raw) - len(raw.lstrip()))
+            yield start, start + len(stripped)
+        pos = stop + 2
+
+
+def _split_long_paragraph(start: int, end: int, max_chars: int) -> Iterator[tuple[int, int]]:
+    while True:
+        stop = min(start + max_chars, end)
+        yield start, stop
+        start = stop
+        if start >= end:
+            return
+
+
+def _split_by_tokens(
+    text: str,
+    start: int,
+    end: int,
+    max_tokens: int,
+    overlap_tokens: int,
+    count_tokens: Callable[[str], int],
+) -> Iterator[Span]:
+    total = count_tokens(text[start:end])
+    if total <= max_tokens:
+        yield start, end, total
+        return
+
+    units: list[Span] = []
+    for sent_start, sent_end in _sentence_spans(text, start, end):
+        tokens = count_tokens(text[sent_start:sent_end])
+        if tokens <= max_tokens:
+            units.append((sent_start, sent_end, tokens))
+            continue
+        # A single sentence over budget: fall back to word boundaries.
+        for m in WORD_RE.finditer(text, sent_start, sent_end):
+            word_end = m.start() + len(m.group().rstrip())
+            units.append((m.start(), word_end, count_tokens(text[m.start():word_end])))
+
+    chunk: list[Span] = []
+    chunk_tokens = 0
+    fresh = 0  # units in ``chunk`` not carried over from the previous chunk
+    for unit in units:
+        if chunk and chunk_tokens + unit[2] > max_tokens:
+            if fresh:
+                chunk_start, chunk_end = chunk[0][0], chunk[-1][1]
+                yield chunk_start, chunk_end, count_tokens(text[chunk_start:chunk_end])
+                chunk = _overlap_tail(chunk, overlap_tokens)
+            while chunk and sum(u[2] for u in chunk) + unit[2] > max_tokens:
+                chunk.pop(0)
+            chunk_tokens = sum(u[2] for u in chunk)
+            fresh = 0
+        chunk.append(unit)
+        chunk_tokens += unit[2]
+        fresh += 1
+
+    if chunk and fresh:
+        chunk_start, chunk_end = chunk[0][0], chunk[-1][1]
+        yield chunk_start, chunk_end, count_tokens(text[chunk_start:chunk_end])
+
+
+def _overlap_tail(chunk: list[Span], overlap_tokens: int) -> list[Span]:
+    tail: list[Span] = []
+    tokens = 0
+    for unit in reversed(chunk):
+        if tokens + unit[2] > overlap_tokens:
+            break
+        tail.insert(0, unit)
+        tokens += unit[2]
+    return tail
 
-def _split_long_paragraph(text: str, max_chars: int) -> list[str]:
-    if len(text) <= max_chars:
-        return [text]
 
-    chunks: list[str] = []
-    start = 0
-    while start < len(text):
-        end = min(start + max_chars, len(text))
-        chunks.append(text[start:end])
-        start = end
-    return chunks
+def _sentence_spans(text: str, start: int, end: int) -> Iterator[tuple[int, int]]:
+    pos = start
+    for m in SENTENCE_END_RE.finditer(text, start, end):
+        sent_end = m.start() + len(m.group().rstrip())
+        yield pos, sent_end
+        pos = m.end()
+    if pos < end:
+        yield pos, end
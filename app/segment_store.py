@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Callable, Iterator, overload
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.config import Settings
+from app.models import DocumentSegmentIndex
+from app.segment import Segment, iter_segments, iter_token_segments
+from app.tokens import count_tokens
+
+
+def segment_index_version(settings: Settings) -> str:
+    """Version key for persisted segment layouts; changes whenever segmentation would."""
+    if settings.segment_splitter == "tokens":
+        return (
+            f"v2:tokens={settings.max_segment_tokens}"
+            f":overlap={settings.segment_overlap_tokens}"
+            f":model={settings.openai_embedding_model}"
+        )
+    return f"v1:chars={settings.max_segment_chars}"
+
+
+def segmenter_for(settings: Settings) -> Callable[[str], Iterator[Segment]]:
+    if settings.segment_splitter == "tokens":
+        return partial(
+            iter_token_segments,
+            max_tokens=settings.max_segment_tokens,
+            count_tokens=partial(count_tokens, model=settings.openai_embedding_model),
+            overlap_tokens=settings.segment_overlap_tokens,
+        )
+    return partial(iter_segments, max_chars=settings.max_segment_chars)
+
+
+class DocumentSegments:
+    """Read-only view of a document's segments: the stored offset index over its normalized text.
+
+    Segments are materialized on access, so holding one costs the text plus
+    a few integers per segment.
+    """
+
+    def __init__(self, text: str, chapters: list[str], entries: list[list]):
+        self._text = text
+        self._chapters = chapters
+        self._entries = entries
+        self._positions: dict[str, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _segment(self, i: int) -> Segment:
+        segment_id, chapter_idx, paragraph_index, start, end, *rest = self._entries[i]
+        return Segment(
+            segment_id=segment_id,
+            text=self._text[start:end],
+            chapter=self._chapters[chapter_idx] if chapter_idx >= 0 else None,
+            paragraph_index=paragraph_index,
+            start_offset=start,
+            end_offset=end,
+            token_count=rest[0] if rest else None,
+        )
+
+    @overload
+    def __getitem__(self, key: int) -> Segment: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> list[Segment]: ...
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._segment(i) for i in range(*key.indices(len(self._entries)))]
+        if key < 0:
+            key += len(self._entries)
+        if not 0 <= key < len(self._entries):
+            raise IndexError(key)
+        return self._segment(key)
+
+    def __iter__(self) -> Iterator[Segment]:
+        for i in range(len(self._entries)):
+            yield self._segment(i)
+
+    def offsets(self, i: int) -> tuple[int, int]:
+        """(start, end) character offsets of segment ``i`` in the normalized text."""
+        row = self._entries[i]
+        return row[3], row[4]
+
+    def text_between(self, start: int, end: int) -> str:
+        return self._text[start:end]
+
+    def position(self, segment_id: str) -> int | None:
+        if self._positions is None:
+            self._positions = {row[0]: i for i, row in enumerate(self._entries)}
+        return self._positions.get(segment_id)
+
+
+def load_document_segments(
+    db: Session, document_id: UUID, version: str, text: str
+) -> DocumentSegments | None:
+    """Return the stored segments for ``text``, or None when no usable index exists."""
+    row = db.execute(
+        select(DocumentSegmentIndex)
+        .where(DocumentSegmentIndex.document_id == document_id)
+        .where(DocumentSegmentIndex.version == version)
+    ).scalars().first()
+    if row is None:
+        return None
+
+    entries = row.entries["segments"]
+    if entries and entries[-1][4] > len(text):
+        # Offsets don't fit this text; treat the index as stale.
+        return None
+    return DocumentSegments(text, row.entries["chapters"], entries)
+
+
+class SegmentIndexBuilder:
+    """Accumulates the compact index rows for segments as they stream past."""
+
+    def __init__(self):
+        self._chapters: list[str] = []
+        self._chapter_ids: dict[str, int] = {}
+        self._rows: list[list] = []
+
+    def add(self, seg: Segment):
+        chapter_idx = -1
+        if seg.chapter is not None:
+            chapter_idx = self._chapter_ids.get(seg.chapter, -1)
+            if chapter_idx < 0:
+                chapter_idx = self._chapter_ids[seg.chapter] = len(self._chapters)
+                self._chapters.append(seg.chapter)
+        row = [seg.segment_id, chapter_idx, seg.paragraph_index, seg.start_offset, seg.end_offset]
+        if seg.token_count is not None:
+            row.append(seg.token_count)
+        self._rows.append(row)
+
+    def save(self, db: Session, document_id: UUID, version: str):
+        # One layout per document: a new version replaces any older one.
+        db.execute(delete(DocumentSegmentIndex).where(DocumentSegmentIndex.document_id == document_id))
+        db.add(
+            DocumentSegmentIndex(
+                document_id=document_id,
+                version=version,
+                segment_count=len(self._rows),
+                entries={"chapters": self._chapters, "segments": self._rows},
+            )
+        )
+        db.commit()
+
+
+def iter_document_segments(
+    db: Session,
+    document_id: UUID,
+    version: str,
+    text: str,
+    segmenter: Callable[[str], Iterator[Segment]],
+) -> Iterator[Segment]:
+    """Stream a document's segments from its stored index, or segment it and store the index.
+
+    The index is written once the segmenter is exhausted, so a consumer that
+    stops early leaves no partial index behind.
+    """
+    stored = load_document_segments(db, document_id, version, text)
+    if stored is not None:
+        yield from stored
+        return
+
+    builder = SegmentIndexBuilder()
+    for seg in segmenter(text):
+        builder.add(seg)
+        yield seg
+    builder.save(db, document_id, version)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Callable
+
+
+class RollingSummaryContext:
+    """Bounded prior context for sequential book summarization.
+
+    Holds a synopsis of older chunks (at most ``synopsis_tokens``, and never
+    more than half of ``budget_tokens``) plus recent chunk summaries verbatim.
+    When the whole context outgrows ``budget_tokens`` or the verbatim window
+    outgrows ``2 * recent_chunks`` entries, the oldest entries are folded into
+    the synopsis with one ``compress(synopsis, summaries, max_tokens)`` call,
+    which updates the existing synopsis rather than rebuilding it. Folding
+    stops once ``recent_chunks`` summaries remain and fit beside the synopsis.
+    """
+
+    def __init__(
+        self,
+        compress: Callable[[str, list[str], int], str],
+        count_tokens: Callable[[str], int],
+        budget_tokens: int,
+        recent_chunks: int,
+        synopsis_tokens: int | None = None,
+    ):
+        self._compress = compress
+        self._count_tokens = count_tokens
+        self._budget = max(1, budget_tokens)
+        self._keep = max(1, recent_chunks)
+        self._synopsis_cap = synopsis_tokens
+        self.synopsis = ""
+        self._synopsis_tokens = 0
+        self._recent: list[tuple[str, int]] = []
+        self.compressions = 0
+
+    @property
+    def synopsis_budget(self) -> int:
+        if self._synopsis_cap:
+            return max(1, min(self._synopsis_cap, self._budget // 2))
+        return self._budget // 2
+
+    @property
+    def tokens(self) -> int:
+        return self._synopsis_tokens + self._recent_tokens()
+
+    def seed(self, summary: str):
+        """Start from an already-accumulated summary, e.g. when resuming a partial run."""
+        if not summary:
+            return
+        tokens = self._count_tokens(summary)
+        self._recent.append((summary, tokens))
+        if tokens > self._budget - self.synopsis_budget:
+            self._fold(1)
+
+    def add(self, chunk_summary: str):
+        self._recent.append((chunk_summary, self._count_tokens(chunk_summary)))
+        if len(self._recent) <= 2 * self._keep and self.tokens <= self._budget:
+            return
+        # Fold down to recent_chunks entries (fewer only if they don't fit beside a
+        # full synopsis), so the window refills for a few chunks before the next update.
+        recent_budget = self._budget - self.synopsis_budget
+        count = 0
+        remaining = self._recent_tokens()
+        while count < len(self._recent) - 1 and (
+            len(self._recent) - count > self._keep or remaining > recent_budget
+        ):
+            remaining -= self._recent[count][1]
+            count += 1
+        if count:
+            self._fold(count)
+
+    def _recent_tokens(self) -> int:
+        return sum(n for _, n in self._recent)
+
+    def _fold(self, count: int):
+        folded = [text for text, _ in self._recent[:count]]
+        self._recent = self._recent[count:]
+        self.synopsis = self._compress(self.synopsis, folded, self.synopsis_budget)
+        self._synopsis_tokens = self._count_tokens(self.synopsis)
+        self.compressions += 1
+
+    def render(self) -> str:
+        recent = "\n\n".join(text for text, _ in self._recent)
+        if not self.synopsis:
+            return recent
+        if not recent:
+            return f"Synopsis of the story so far:\n{self.synopsis}"
+        return f"Synopsis of earlier parts:\n{self.synopsis}\n\nMost recent sections:\n{recent}"
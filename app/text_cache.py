@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from app.config import get_settings
+from app.logging_config import configure_logging
+
+logger = configure_logging("text_cache", "worker.log")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TextCache:
+    """Content-addressed store of normalized Gutenberg texts.
+
+    Texts live at ``<root>/blobs/<sha256>.txt`` and ``<root>/ids/<gutenberg_id>``
+    holds the hash last seen for that book. Reads bump the blob's mtime, which
+    is what LRU eviction orders by once the store grows past ``max_bytes``.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self._blobs = root / "blobs"
+        self._ids = root / "ids"
+        self._blobs.mkdir(parents=True, exist_ok=True)
+        self._ids.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._blobs / f"{digest}.txt"
+
+    def lookup(self, gutenberg_id: int) -> str | None:
+        """Return the content hash cached for a Gutenberg id, if its text is present."""
+        try:
+            digest = (self._ids / str(gutenberg_id)).read_text(encoding="ascii").strip()
+        except FileNotFoundError:
+            return None
+        return digest if self._blob_path(digest).exists() else None
+
+    def read(self, digest: str) -> str | None:
+        path = self._blob_path(digest)
+        try:
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return text
+
+    def write(self, gutenberg_id: int, text: str) -> str:
+        digest = content_hash(text)
+        path = self._blob_path(digest)
+        if not path.exists():
+            _atomic_write(path, text.encode("utf-8"))
+        _atomic_write(self._ids / str(gutenberg_id), digest.encode("ascii"))
+        self._evict()
+        return digest
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self._blobs.glob("*.txt"):
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+            if total <= self._max_bytes:
+                return
+            entries.sort()
+            # Never evict the most recently used blob (the one just written or read).
+            for _, size, path in entries[:-1]:
+                if total <= self._max_bytes:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                    logger.info("text_cache evicted %s (%s bytes)", path.name, size)
+                except FileNotFoundError:
+                    continue
+
+
+def _atomic_write(path: Path, data: bytes):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+@lru_cache
+def get_text_cache() -> TextCache:
+    settings = get_settings()
+    return TextCache(Path(settings.data_dir) / "texts", settings.text_cache_max_bytes)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+import tiktoken
+
+from app.logging_config import configure_logging
+
+logger = configure_logging("tokens", "worker.log")
+
+DEFAULT_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str | None = None) -> tiktoken.Encoding | None:
+    """tiktoken encoding for ``model``, or None if it can't be loaded (e.g. no network for the BPE file)."""
+    try:
+        if model:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                pass
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("tiktoken encoding unavailable for model=%s, estimating tokens: %s", model, exc)
+        return None
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    enc = get_encoding(model)
+    if enc is None:
+        # Roughly four characters per token for English prose.
+        return (len(text) + 3) // 4
+    return len(enc.encode_ordinary(text))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str | None = None) -> str:
+    """Cut ``text`` to at most ``max_tokens``, at the last paragraph or sentence break that fits."""
+    if max_tokens <= 0:
+        return ""
+    enc = get_encoding(model)
+    if enc is None:
+        if (len(text) + 3) // 4 <= max_tokens:
+            return text
+        head = text[: max_tokens * 4]
+    else:
+        ids = enc.encode_ordinary(text)
+        if len(ids) <= max_tokens:
+            return text
+        head = enc.decode(ids[:max_tokens])
+    for sep in ("\n\n", ". ", "\n"):
+        cut = head.rfind(sep)
+        if cut > len(head) // 2:
+            return head[: cut + len(sep)].rstrip()
+    return head.rstrip()
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from app.config import get_settings
+from app.logging_config import configure_logging
+from app.pinecone_client import (
+    PineconeClient,
+    delete_namespace,
+    list_namespaces,
+    namespace_vector_count,
+    query_similar,
+    query_similar_batch,
+    upsert_embeddings,
+)
+
+# A match is {"id": str, "score": float, "metadata": dict}
+Match = dict
+
+
+class VectorStore(ABC):
+    """Per-namespace vector storage with cosine top-k search."""
+
+    @abstractmethod
+    def ensure_ready(self, dimension: int):
+        """Create whatever backing index is needed before the first upsert."""
+
+    @abstractmethod
+    def upsert(self, namespace: str, vectors: Iterable[tuple[str, list[float], dict]]):
+        ...
+
+    @abstractmethod
+    def query(self, namespace: str, vector: list[float], top_k: int) -> list[Match]:
+        ...
+
+    def query_many(self, namespace: str, vectors: list[list[float]], top_k: int) -> list[list[Match]]:
+        """Top-k matches for each query vector, in input order."""
+        return [self.query(namespace, vector, top_k) for vector in vectors]
+
+    @abstractmethod
+    def namespace_count(self, namespace: str) -> int:
+        ...
+
+    @abstractmethod
+    def list_namespaces(self) -> dict[str, int]:
+        """Return {namespace: vector_count} for every namespace in the store."""
+
+    @abstractmethod
+    def delete_namespace(self, namespace: str):
+        ...
+
+
+class PineconeVectorStore(VectorStore):
+    def __init__(self):
+        self._pc = PineconeClient()
+
+    def ensure_ready(self, dimension: int):
+        self._pc.ensure_index(dimension=dimension)
+
+    def upsert(self, namespace: str, vectors: Iterable[tuple[str, list[float], dict]]):
+        upsert_embeddings(self._pc, namespace, vectors)
+
+    def query(self, namespace: str, vector: list[float], top_k: int) -> list[Match]:
+        return self._matches(query_similar(self._pc, namespace, vector, top_k=top_k))
+
+    def query_many(self, namespace: str, vectors: list[list[float]], top_k: int) -> list[list[Match]]:
+        results = query_similar_batch(self._pc, namespace, vectors, top_k=top_k)
+        return [self._matches(result) for result in results]
+
+    @staticmethod
+    def _matches(result) -> list[Match]:
+        return [
+            {"id": m.get("id"), "score": m.get("score"), "metadata": m.get("metadata") or {}}
+            for m in result.get("matches", [])
+        ]
+
+    def namespace_count(self, namespace: str) -> int:
+        return namespace_vector_count(self._pc, namespace)
+
+    def list_namespaces(self) -> dict[str, int]:
+        return list_namespaces(self._pc)
+
+    def delete_namespace(self, namespace: str):
+        delete_namespace(self._pc, namespace)
+
+
+class _LocalNamespace:
+    """One namespace on disk: L2-normalized float32 rows plus a JSONL row of id/metadata each."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.vectors_path = path / "vectors.f32"
+        self.meta_path = path / "meta.jsonl"
+        self.info_path = path / "info.json"
+        self._stamp: tuple | None = None
+        self.ids: list[str] = []
+        self.metadata: list[dict] = []
+        self.row_of: dict[str, int] = {}
+        self.matrix: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        # False when the files hold rows beyond those loaded, after an interrupted append
+        self.aligned = True
+
+    def _current_stamp(self) -> tuple | None:
+        try:
+            v = self.vectors_path.stat()
+            m = self.meta_path.stat()
+        except FileNotFoundError:
+            return None
+        return (v.st_mtime_ns, v.st_size, m.st_mtime_ns, m.st_size)
+
+    def refresh(self):
+        """Reload from disk if another process (or thread) changed the files."""
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return
+        self._stamp = stamp
+        if stamp is None:
+            self.ids, self.metadata, self.row_of = [], [], {}
+            self.matrix = np.zeros((0, 0), dtype=np.float32)
+            self.aligned = True
+            return
+        dimension = json.loads(self.info_path.read_text())["dimension"]
+        self.ids, self.metadata = [], []
+        with self.meta_path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # a writer is mid-append; the next refresh picks it up
+                self.ids.append(row["id"])
+                self.metadata.append(row["metadata"])
+        # Only rows present in both files count: metadata is written before its
+        # vectors, so an interrupted append leaves metadata rows without vectors.
+        rows = min(len(self.ids), stamp[1] // (4 * dimension))
+        self.aligned = len(self.ids) == rows and stamp[1] == rows * 4 * dimension
+        del self.ids[rows:], self.metadata[rows:]
+        self.row_of = {vid: i for i, vid in enumerate(self.ids)}
+        if rows:
+            self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, dimension))
+        else:
+            self.matrix = np.zeros((0, dimension), dtype=np.float32)
+
+
+class LocalVectorStore(VectorStore):
+    """Brute-force cosine search over memory-mapped float32 matrices on the data volume.
+
+    Books top out at tens of thousands of segments, so one matrix-vector
+    product per query is far cheaper than a round-trip to a hosted index.
+    """
+
+    def __init__(self, root: Path):
+        self._root = root
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._namespaces: dict[str, _LocalNamespace] = {}
+        self._lock = threading.RLock()
+        self._logger = configure_logging("vector_store", "worker.log")
+
+    def _ns(self, namespace: str) -> _LocalNamespace:
+        ns = self._namespaces.get(namespace)
+        if ns is None:
+            ns = self._namespaces[namespace] = _LocalNamespace(self._root / quote(namespace, safe=""))
+        ns.refresh()
+        return ns
+
+    def ensure_ready(self, dimension: int):
+        pass
+
+    def upsert(self, namespace: str, vectors: Iterable[tuple[str, list[float], dict]]):
+        items = list(vectors)
+        if not items:
+            return
+        matrix = np.asarray([values for _, values, _ in items], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+
+        with self._lock:
+            ns = self._ns(namespace)
+            ns.path.mkdir(parents=True, exist_ok=True)
+            if not ns.info_path.exists():
+                ns.info_path.write_text(json.dumps({"namespace": namespace, "dimension": matrix.shape[1]}))
+
+            if not ns.aligned:
+                self._repair(ns)
+            new_rows = [i for i, (vid, _, _) in enumerate(items) if vid not in ns.row_of]
+            existing = [i for i, (vid, _, _) in enumerate(items) if vid in ns.row_of]
+            if existing:
+                # Overwrite in place, as a Pinecone upsert would.
+                mm = np.memmap(ns.vectors_path, dtype=np.float32, mode="r+", shape=ns.matrix.shape)
+                for i in existing:
+                    row = ns.row_of[items[i][0]]
+                    mm[row] = matrix[i]
+                    ns.metadata[row] = items[i][2]
+                mm.flush()
+                del mm
+                self._rewrite_meta(ns)
+            if new_rows:
+                with ns.meta_path.open("a", encoding="utf-8") as fh:
+                    for i in new_rows:
+                        vid, _, metadata = items[i]
+                        fh.write(json.dumps({"id": vid, "metadata": metadata}) + "\n")
+                with ns.vectors_path.open("ab") as fh:
+                    fh.write(matrix[new_rows].tobytes())
+            ns.refresh()
+            self._logger.info("local upsert namespace=%s sent=%s total=%s", namespace, len(items), len(ns.ids))
+
+    def _repair(self, ns: _LocalNamespace):
+        """Cut both files back to the rows they have in common, so appends stay aligned."""
+        self._logger.info("local repair namespace=%s keeping=%s rows", ns.path.name, len(ns.ids))
+        with ns.vectors_path.open("r+b") as fh:
+            fh.truncate(len(ns.ids) * ns.matrix.shape[1] * 4)
+        self._rewrite_meta(ns)
+        ns.refresh()
+
+    def _rewrite_meta(self, ns: _LocalNamespace):
+        tmp = ns.meta_path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for vid, metadata in zip(ns.ids, ns.metadata):
+                fh.write(json.dumps({"id": vid, "metadata": metadata}) + "\n")
+        os.replace(tmp, ns.meta_path)
+
+    def query(self, namespace: str, vector: list[float], top_k: int) -> list[Match]:
+        return self.query_many(namespace, [vector], top_k)[0]
+
+    def query_many(self, namespace: str, vectors: list[list[float]], top_k: int) -> list[list[Match]]:
+        with self._lock:
+            ns = self._ns(namespace)
+            matrix, ids, metadata = ns.matrix, ns.ids, ns.metadata
+        if not ids or top_k <= 0 or not vectors:
+            return [[] for _ in vectors]
+        queries = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries /= np.where(norms == 0, 1, norms)
+        # (segments x queries): every theme scored in a single matrix product
+        scores = matrix @ queries.T
+        k = min(top_k, len(ids))
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+        results = []
+        for col in range(scores.shape[1]):
+            rows = top[:, col]
+            rows = rows[np.argsort(-scores[rows, col])]
+            results.append(
+                [{"id": ids[i], "score": float(scores[i, col]), "metadata": metadata[i]} for i in rows]
+            )
+        return results
+
+    def namespace_count(self, namespace: str) -> int:
+        with self._lock:
+            return len(self._ns(namespace).ids)
+
+    def list_namespaces(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                unquote(path.name): len(self._ns(unquote(path.name)).ids)
+                for path in self._root.iterdir()
+                if path.is_dir()
+            }
+
+    def delete_namespace(self, namespace: str):
+        with self._lock:
+            self._namespaces.pop(namespace, None)
+            shutil.rmtree(self._root / quote(namespace, safe=""), ignore_errors=True)
+            self._logger.info("local delete_namespace namespace=%s", namespace)
+
+
+@lru_cache
+def _local_store() -> LocalVectorStore:
+    return LocalVectorStore(Path(get_settings().data_dir) / "vectors")
+
+
+def get_vector_store() -> VectorStore:
+    backend = get_settings().vector_backend
+    if backend == "local":
+        return _local_store()
+    if backend == "pinecone":
+        return PineconeVectorStore()
+    raise RuntimeError(f"Unknown VECTOR_BACKEND: {backend}")
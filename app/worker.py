@@ -7,7 +7,9 @@ from sqlalchemy.orm import Session
 
 from app.config import get_settings
 from app.db import SessionLocal
-from app.graph.builder import build_essay_graph
+from app.graph.builder import get_essay_graph
+from app.graph.checkpoint import get_checkpointer
+from app.graph.runtime import get_runtime
 from app.logging_config import configure_logging, log_startup_config
 from app.models import Document, Job
 from app.queue import claim_next_job, mark_job_failed, KeepaliveThread
@@ -32,9 +34,27 @@ def build_initial_state(db: Session, job: Job) -> dict:
 
 
 async def process_job(db: Session, job: Job):
-    initial_state = build_initial_state(db, job)
-    graph = build_essay_graph()
-    await asyncio.to_thread(graph.invoke, initial_state)
+    checkpointer = get_checkpointer()
+    graph = get_essay_graph()
+    config = {
+        "max_concurrency": get_settings().graph_concurrency,
+        "configurable": {"thread_id": str(job.id), "runtime": get_runtime()},
+    }
+    graph_input = build_initial_state(db, job)
+    if checkpointer is not None:
+        # A requeued job that already has a checkpoint picks up after its last completed node.
+        snapshot = await asyncio.to_thread(graph.get_state, config)
+        if snapshot.next:
+            logger.info("resuming job %s from checkpoint at %s", job.id, ", ".join(snapshot.next))
+            graph_input = None
+    await asyncio.to_thread(graph.invoke, graph_input, config)
+    discard_checkpoint(job)
+
+
+def discard_checkpoint(job: Job):
+    checkpointer = get_checkpointer()
+    if checkpointer is not None:
+        checkpointer.delete_thread(str(job.id))
 
 
 async def run_worker():
@@ -63,6 +83,11 @@ async def run_worker():
             if job:
                 with SessionLocal() as db:
                     mark_job_failed(db, job, str(exc))
+                try:
+                    # Failed jobs are not resumed; drop their checkpoints.
+                    discard_checkpoint(job)
+                except Exception:
+                    logger.exception("could not discard checkpoint for job %s", job.id)
             await asyncio.sleep(settings.worker_poll_seconds)
 
 
@@ -0,0 +1,101 @@
+"""Benchmark the character splitter against the token/sentence splitter.
+
+Usage (from repo root):
+
+    python scripts/bench_segment.py                     # default Gutenberg sample
+    python scripts/bench_segment.py 1342 2701           # specific Gutenberg ids
+    python scripts/bench_segment.py --file book.txt     # local normalized texts
+
+For each text it reports segmentation throughput, segment counts and the
+distribution of embedding tokens per segment, plus how many character
+segments end mid-word.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config import get_settings  # noqa: E402
+from app.gutenberg import load_gutenberg_text  # noqa: E402
+from app.segment import iter_segments, iter_token_segments  # noqa: E402
+from app.tokens import count_tokens  # noqa: E402
+
+# Pride and Prejudice, Moby Dick, Complete Shakespeare, Gibbon vol. 1
+DEFAULT_IDS = [1342, 2701, 100, 731]
+
+
+def _percentile(values: list[int], pct: float) -> int:
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _run(name: str, text: str, segmenter, counter, repeats: int):
+    timings = []
+    segments = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        segments = list(segmenter(text))
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    tokens = [seg.token_count if seg.token_count is not None else counter(seg.text) for seg in segments]
+    mid_word = sum(
+        1
+        for seg in segments
+        if seg.end_offset < len(text) and text[seg.end_offset - 1].isalnum() and text[seg.end_offset].isalnum()
+    )
+    mb = len(text.encode("utf-8")) / (1024 * 1024)
+    print(
+        f"  {name:<8} {mb / best:8.2f} MB/s  segments={len(segments):6d}  "
+        f"tokens min/p50/p95/max={min(tokens, default=0)}/{int(statistics.median(tokens or [0]))}/"
+        f"{_percentile(tokens, 0.95)}/{max(tokens, default=0)}  "
+        f"total_tokens={sum(tokens)}  mid_word_cuts={mid_word}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("ids", nargs="*", type=int, help="Gutenberg ids (default: a fixed sample)")
+    parser.add_argument("--file", action="append", default=[], help="path to a normalized text file")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    counter = partial(count_tokens, model=settings.openai_embedding_model)
+    splitters = {
+        "chars": partial(iter_segments, max_chars=settings.max_segment_chars),
+        "tokens": partial(
+            iter_token_segments,
+            max_tokens=settings.max_segment_tokens,
+            count_tokens=counter,
+            overlap_tokens=settings.segment_overlap_tokens,
+        ),
+    }
+
+    texts: list[tuple[str, str]] = []
+    for path in args.file:
+        with open(path, encoding="utf-8") as fh:
+            texts.append((path, fh.read()))
+    for gutenberg_id in args.ids or ([] if args.file else DEFAULT_IDS):
+        _, text = load_gutenberg_text(gutenberg_id)
+        texts.append((f"gutenberg:{gutenberg_id}", text))
+
+    print(
+        f"max_segment_chars={settings.max_segment_chars} max_segment_tokens={settings.max_segment_tokens} "
+        f"segment_overlap_tokens={settings.segment_overlap_tokens}"
+    )
+    for label, text in texts:
+        print(f"{label} ({len(text):,} chars)")
+        for name, segmenter in splitters.items():
+            _run(name, text, segmenter, counter, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from app.graph.prompt_budget import select_evidence
+from app.tokens import count_tokens, truncate_tokens
+
+THEMES = ["Love", "Death"]
+EVIDENCE = {
+    "Love": [
+        {"segment_id": "p00002", "passage_id": "c1", "score": 0.7},
+        {"segment_id": "p00001", "passage_id": "c1", "score": 0.9},
+    ],
+    "Death": [{"segment_id": "p00009", "passage_id": "c2", "score": 0.8}],
+}
+PASSAGE_TOKENS = {"c1": 25, "c2": 30}
+
+
+def item_tokens(item: dict, with_text: bool) -> int:
+    # A quoted segment costs 10; a reference to one quoted elsewhere costs 2
+    return 10 if with_text else 2
+
+
+def _select(budget: int, evidence: dict = EVIDENCE) -> dict[str, list[tuple[str, str | None]]]:
+    kept = select_evidence(THEMES, evidence, PASSAGE_TOKENS, item_tokens, budget)
+    return {theme: [(i["segment_id"], i["passage_id"]) for i in items] for theme, items in kept.items()}
+
+
+def test_select_evidence_budget_fits_nothing():
+    assert _select(5) == {"Love": [], "Death": []}
+
+
+def test_select_evidence_keeps_each_themes_best_match_first():
+    # Top matches of both themes (20 tokens) fit; Love's second match would not
+    assert _select(25) == {"Love": [("p00001", None)], "Death": [("p00009", None)]}
+
+
+def test_select_evidence_budget_fits_only_bare_quotes():
+    # Three quotes use all 30 tokens; no passage fits on top of them
+    assert _select(30) == {
+        "Love": [("p00002", None), ("p00001", None)],
+        "Death": [("p00009", None)],
+    }
+
+
+def test_select_evidence_restores_passages_best_first():
+    # c1 replaces two quotes (25 + 2 * 2 - 20 = 9 more tokens); c2 (22 more) doesn't fit
+    assert _select(39) == {
+        "Love": [("p00002", "c1"), ("p00001", "c1")],
+        "Death": [("p00009", None)],
+    }
+
+
+def test_select_evidence_budget_fits_full_passages():
+    assert _select(61) == {
+        "Love": [("p00002", "c1"), ("p00001", "c1")],
+        "Death": [("p00009", "c2")],
+    }
+
+
+def test_select_evidence_quotes_shared_segment_once():
+    evidence = {**EVIDENCE, "Death": [{"segment_id": "p00001", "passage_id": "c1", "score": 0.8}]}
+
+    # The second citation of p00001 refers back to its quote for 2 tokens, leaving no room for p00002
+    assert _select(21, evidence) == {"Love": [("p00001", None)], "Death": [("p00001", None)]}
+
+
+def test_truncate_tokens_returns_text_that_fits():
+    text = "A short sentence."
+    assert truncate_tokens(text, 100) == text
+
+
+def test_truncate_tokens_budget_fits_nothing():
+    assert truncate_tokens("Anything at all.", 0) == ""
+    assert truncate_tokens("Anything at all.", -3) == ""
+
+
+def test_truncate_tokens_cuts_at_paragraph_break():
+    first = " ".join(["Words in the first paragraph."] * 20)
+    text = first + "\n\n" + " ".join(["More words in the second paragraph."] * 20)
+    budget = count_tokens(first) + 5
+
+    cut = truncate_tokens(text, budget)
+
+    assert cut == first
+    assert count_tokens(cut) <= budget
+
+
+def test_truncate_tokens_cuts_at_sentence_break():
+    text = " ".join(f"Sentence number {i} ends here." for i in range(50))
+
+    cut = truncate_tokens(text, 40)
+
+    assert cut.endswith("ends here.")
+    assert text.startswith(cut)
+    assert 0 < count_tokens(cut) <= 40
@@ -0,0 +1,64 @@
+from app.graph.nodes import _splice_sections
+from app.graph.review_checks import check_essay, theme_sections
+
+NESTED = (
+    "# Essay\n\n"
+    "## Love and Death\n\nLove endures [p00001].\n\n"
+    "### Death\n\nDeath ends [p00002].\n\n"
+    "## Conclusion\n\nBoth matter [p00003].\n"
+)
+
+
+def test_theme_sections_do_not_overlap():
+    found = theme_sections(NESTED, ["Love and Death", "Death"])
+
+    outer = found["Love and Death"]
+    assert outer.text.startswith("## Love and Death")
+    assert "### Death" in outer.text
+    assert "## Conclusion" not in outer.text
+    # "### Death" sits inside the first theme's section, so it isn't claimed twice
+    assert "Death" not in found
+
+
+def test_theme_sections_prefer_exact_heading():
+    found = theme_sections(NESTED, ["Death", "Love and Death"])
+
+    assert found["Death"].heading == "Death"
+    # Its section would contain the "Death" section, so it stays unclaimed
+    assert "Love and Death" not in found
+
+
+def test_check_essay_counts_each_section_once():
+    check = check_essay(
+        NESTED, ["Love and Death", "Death"], {"p00001", "p00002", "p00003"}, lambda sid: True, min_citations=1
+    )
+
+    # Death is only discussed inside another theme's section: for the model to judge
+    assert check.verdict == "llm"
+    assert not check.theme_issues
+
+
+def test_splice_sections_merges_overlapping_edits():
+    located = {
+        "Love and Death": theme_sections(NESTED, ["Love and Death"])["Love and Death"],
+        "Death": theme_sections(NESTED, ["Death"])["Death"],
+    }
+    insert_at = NESTED.index("## Conclusion")
+    texts = {"Love and Death": "## Love and Death\n\nRevised love.", "Death": "### Death\n\nRevised death."}
+
+    essay = _splice_sections(NESTED, located, texts, insert_at)
+
+    assert "Revised love." in essay
+    assert "Revised death." in essay
+    assert essay.index("Revised love.") < essay.index("Revised death.") < essay.index("## Conclusion")
+    assert essay.endswith("## Conclusion\n\nBoth matter [p00003].\n")
+    assert "Love endures" not in essay and "Death ends" not in essay
+
+
+def test_splice_sections_inserts_missing_theme_before_conclusion():
+    located = theme_sections(NESTED, ["Love and Death"])
+    insert_at = NESTED.index("## Conclusion")
+
+    essay = _splice_sections(NESTED, located, {"Fate": "## Fate\n\nFate decides [p00004]."}, insert_at)
+
+    assert essay.index("### Death") < essay.index("## Fate") < essay.index("## Conclusion")